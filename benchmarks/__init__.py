@@ -0,0 +1,4 @@
+"""Benchmark suite for the fetch / parse / aggregate hot paths.
+
+Run ``python -m benchmarks.run --help`` from the repository root.
+"""
@@ -0,0 +1,119 @@
+"""Synthetic Nitter RSS corpora.
+
+Feeds mimic what Nitter's ``/<user>/rss`` endpoint returns: ``dc:creator``
+authors, HTML descriptions wrapped in CDATA with mentions, links and
+``<img>`` tags, RFC 822 ``pubDate`` values and ``/status/<id>#m`` guids.
+A share of items are retweets of statuses that also appear in other
+feeds, as they do in real timelines.
+"""
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+_WORDS = (
+    "nitter", "timeline", "rust", "python", "release", "thread", "update",
+    "today", "launch", "bug", "fix", "performance", "cache", "latency",
+    "mirror", "feed", "open", "source", "weekend", "coffee", "news",
+)
+
+BASE = "https://nitter.net"
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _description(rng: random.Random, images: int, size: int) -> str:
+    parts = [f"<p>{_text(rng, size)}"]
+    parts.append(f' <a href="{BASE}/user{rng.randrange(500)}">@user{rng.randrange(500)}</a>')
+    parts.append(f' <a href="https://example.com/{rng.randrange(10**6)}">example.com/…</a></p>')
+    for _ in range(images):
+        parts.append(
+            f'<img src="{BASE}/pic/media%2F{rng.randrange(10**9):x}.jpg"'
+            ' style="max-width:250px;" />'
+        )
+    return "".join(parts)
+
+
+def make_feed(
+    user: str,
+    n_items: int,
+    *,
+    seed: int = 0,
+    images: int = 2,
+    words: int = 30,
+    retweet_ratio: float = 0.2,
+    shared_pool: int = 200,
+    start: datetime | None = None,
+) -> bytes:
+    """Return an RSS document for ``user`` with ``n_items`` entries.
+
+    Args:
+        user: Handle used in the feed and status links.
+        n_items: Number of ``<item>`` elements.
+        seed: RNG seed (the same arguments always produce the same bytes).
+        images: ``<img>`` tags per item.
+        words: Approximate words of text per item.
+        retweet_ratio: Share of items that are retweets from a pool of
+            statuses shared by every feed of the corpus.
+        shared_pool: Size of that shared status pool.
+        start: Timestamp of the newest item (defaults to 2024-01-01 UTC).
+
+    Returns:
+        bytes: UTF-8 encoded RSS 2.0 document.
+    """
+    rng = random.Random(f"{user}:{seed}")
+    now = start or datetime(2024, 1, 1, tzinfo=UTC)
+    items = []
+    for i in range(n_items):
+        published = now - timedelta(minutes=17 * i + rng.randrange(10))
+        if rng.random() < retweet_ratio:
+            shared = rng.randrange(shared_pool)
+            author = f"user{shared % 97}"
+            status = 10**18 + shared
+            title = f"RT by @{user}: {_text(random.Random(shared), 12)}"
+            body = _description(random.Random(shared), images, words)
+        else:
+            author = user
+            status = 2 * 10**18 + rng.randrange(10**15)
+            title = _text(rng, 12)
+            body = _description(rng, images, words)
+        link = f"{BASE}/{author}/status/{status}#m"
+        items.append(
+            "    <item>\n"
+            f"      <title>{escape(title)}</title>\n"
+            f"      <dc:creator>@{author}</dc:creator>\n"
+            f"      <description><![CDATA[{body}]]></description>\n"
+            f"      <pubDate>{format_datetime(published, usegmt=True)}</pubDate>\n"
+            f"      <guid>{link}</guid>\n"
+            f"      <link>{link}</link>\n"
+            "    </item>\n"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss xmlns:atom="http://www.w3.org/2005/Atom" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" version="2.0">\n'
+        "  <channel>\n"
+        f'    <atom:link href="{BASE}/{user}/rss" rel="self" type="application/rss+xml" />\n'
+        f"    <title>{user} / @{user}</title>\n"
+        f"    <link>{BASE}/{user}</link>\n"
+        f"    <description>Twitter feed for: @{user}. Generated by nitter.net</description>\n"
+        "    <language>en-us</language>\n"
+        "    <ttl>40</ttl>\n"
+        + "".join(items)
+        + "  </channel>\n</rss>\n"
+    ).encode("utf-8")
+
+
+def feed_path(user: str) -> str:
+    """Return the Nitter RSS path of ``user``."""
+    return f"/{user}/rss"
+
+
+def parse_path(path: str) -> str | None:
+    """Return the user of a ``/<user>/rss`` path, else ``None``."""
+    parts = path.strip("/").split("/")
+    return parts[0] if len(parts) == 2 and parts[1] == "rss" else None
@@ -0,0 +1,344 @@
+"""Run the benchmark suite and compare against a stored baseline.
+
+Examples::
+
+    python -m benchmarks.run                       # run, compare to baseline
+    python -m benchmarks.run --save-baseline       # run and store as baseline
+    python -m benchmarks.run --only parse_items,aggregate --sizes 20,100
+    python -m benchmarks.run --latency-ms 80 --error-rate 0.05
+
+Results are written to ``benchmarks/results/latest.json``. A benchmark is
+reported as a regression when its median is slower than the baseline by
+more than ``--threshold`` (default 20%).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from benchmarks.corpus import BASE, feed_path, make_feed
+from benchmarks.stub_mirror import StubConfig, StubMirror
+from nitter_timeline.core.config import settings
+from nitter_timeline.services import aggregator, fetcher, sanitize, validation
+from nitter_timeline.services.response_cache import timeline_cache
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+@dataclass
+class Result:
+    """Timing samples of one benchmark (seconds per operation)."""
+
+    name: str
+    samples: list[float]
+    wall: float
+
+    def summary(self) -> dict[str, float]:
+        """Return percentiles (ms) and throughput (ops/s)."""
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+        return {
+            "n": len(ordered),
+            "mean_ms": statistics.fmean(ordered) * 1000,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "ops_per_s": len(ordered) / self.wall if self.wall else 0.0,
+        }
+
+
+def _clear_caches() -> None:
+    aggregator._item_cache.clear()  # pylint: disable=protected-access
+    aggregator._feed_items.clear()  # pylint: disable=protected-access
+    aggregator._seen_statuses.clear()  # pylint: disable=protected-access
+    sanitize._memo.clear()  # pylint: disable=protected-access
+
+
+def _timed(name: str, repeat: int, op: Callable[[], object],
+           setup: Callable[[], object] | None = None) -> Result:
+    samples = []
+    wall = 0.0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        op()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        wall += elapsed
+    return Result(name, samples, wall)
+
+
+async def _atimed(name: str, repeat: int, op: Callable[[], Awaitable[object]],
+                  setup: Callable[[], object] | None = None) -> Result:
+    samples = []
+    wall = 0.0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        await op()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        wall += elapsed
+    return Result(name, samples, wall)
+
+
+class _StubTransport(httpx.AsyncBaseTransport):
+    """Send every request to the stub mirror, keeping path and headers."""
+
+    def __init__(self, base_url: str) -> None:
+        self._inner = httpx.AsyncHTTPTransport()
+        self._base = httpx.URL(base_url)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(
+            scheme=self._base.scheme, host=self._base.host, port=self._base.port
+        )
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def bench_sanitize(size: int, repeat: int) -> Result:
+    parsed = fetcher.parse_feed(make_feed("bench", size))
+    bodies = [e.get("summary", "") for e in parsed["entries"]]
+    return _timed(
+        f"sanitize_html[n={size}]",
+        repeat,
+        lambda: [sanitize.sanitize_html(b, settings.max_images_per_item) for b in bodies],
+        setup=_clear_caches,
+    )
+
+
+def bench_parse_items(size: int, repeat: int) -> Result:
+    parsed = fetcher.parse_feed(make_feed("bench", size))
+    return _timed(
+        f"parse_items[n={size}]",
+        repeat,
+        lambda: aggregator.parse_items(parsed),
+        setup=_clear_caches,
+    )
+
+
+def bench_aggregate(size: int, repeat: int, feeds: int) -> list[Result]:
+    parsed = [
+        (f"{BASE}/user{i}/rss", fetcher.parse_feed(make_feed(f"user{i}", size)))
+        for i in range(feeds)
+    ]
+    cold = _timed(
+        f"aggregate_cold[feeds={feeds},n={size}]",
+        max(1, repeat // 10),
+        lambda: aggregator.aggregate(parsed, limit=100),
+        setup=_clear_caches,
+    )
+    aggregator.aggregate(parsed, limit=100)
+    warm = _timed(
+        f"aggregate_warm[feeds={feeds},n={size}]",
+        repeat,
+        lambda: aggregator.aggregate(parsed, limit=100),
+    )
+    return [cold, warm]
+
+
+def _install_stub_client(mirror: StubMirror) -> None:
+    fetcher._client = httpx.AsyncClient(  # pylint: disable=protected-access
+        transport=_StubTransport(mirror.base_url),
+        timeout=settings.fetch_timeout_seconds,
+    )
+    # The stub is reached through the transport; skip DNS for the feed host.
+    validation._host_verdicts[httpx.URL(BASE).host] = True  # pylint: disable=protected-access
+
+
+def _clear_fetcher() -> None:
+    fetcher._cache.clear()  # pylint: disable=protected-access
+    fetcher._validators.clear()  # pylint: disable=protected-access
+
+
+async def bench_fetch(size: int, repeat: int) -> list[Result]:
+    url = BASE + feed_path("fetchbench")
+    full = await _atimed(
+        f"fetch_feed_200[n={size}]", repeat,
+        lambda: fetcher.fetch_feed(url, force=True), setup=_clear_fetcher,
+    )
+    await fetcher.fetch_feed(url, force=True)
+    revalidate = await _atimed(
+        f"fetch_feed_304[n={size}]", repeat,
+        lambda: fetcher.fetch_feed(url, force=True),
+    )
+    return [full, revalidate]
+
+
+async def _drive(client: httpx.AsyncClient, name: str, params: list[tuple[str, str]],
+                 requests: int, concurrency: int,
+                 setup: Callable[[], object] | None = None) -> Result:
+    samples: list[float] = []
+    queue = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in queue:
+            if setup:
+                setup()
+            start = time.perf_counter()
+            resp = await client.get("/api/timeline", params=params)
+            samples.append(time.perf_counter() - start)
+            resp.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(name, samples, time.perf_counter() - start)
+
+
+async def bench_e2e(
+    size: int, requests: int, feeds: int, concurrency: int
+) -> list[Result]:
+    """Time ``/api/timeline`` served from the response cache and rebuilt.
+
+    Feed snapshots stay warm in both runs; the miss run drops the cached
+    responses before every request so each one is aggregated and
+    serialized again.
+    """
+    from nitter_timeline.main import app  # pylint: disable=import-outside-toplevel
+
+    params = [("feeds", f"{BASE}/e2e{i}/rss") for i in range(feeds)] + [("limit", "100")]
+    label = f"feeds={feeds},n={size},c={concurrency}"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.get("/api/timeline", params=params)).raise_for_status()  # warm-up
+        hit = await _drive(
+            client, f"timeline_e2e_hit[{label}]", params, requests, concurrency
+        )
+        miss = await _drive(
+            client, f"timeline_e2e_miss[{label}]", params, requests, concurrency,
+            setup=timeline_cache.clear,
+        )
+    return [hit, miss]
+
+
+async def run_all(args: argparse.Namespace) -> list[Result]:
+    """Execute the selected benchmarks."""
+    only = set(args.only.split(",")) if args.only else None
+
+    def wanted(name: str) -> bool:
+        return only is None or name in only
+
+    results: list[Result] = []
+    for size in args.sizes:
+        if wanted("sanitize_html"):
+            results.append(bench_sanitize(size, args.repeat))
+        if wanted("parse_items"):
+            results.append(bench_parse_items(size, args.repeat))
+        if wanted("aggregate"):
+            results.extend(bench_aggregate(size, args.repeat, args.feeds))
+    if wanted("fetch_feed") or wanted("timeline_e2e"):
+        config = StubConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+        )
+        with StubMirror(config) as mirror:
+            for size in args.sizes:
+                config.items_per_feed = size
+                config._bodies.clear()  # pylint: disable=protected-access
+                _install_stub_client(mirror)
+                if wanted("fetch_feed"):
+                    results.extend(await bench_fetch(size, args.repeat))
+                if wanted("timeline_e2e"):
+                    _clear_fetcher()
+                    results.extend(
+                        await bench_e2e(size, args.requests, args.feeds, args.concurrency)
+                    )
+                await fetcher.close_client()
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a comparison table; return names of regressed benchmarks."""
+    regressions = []
+    print(f"{'benchmark':48} {'p50 ms':>10} {'base':>10} {'delta':>8} {'ops/s':>10}")
+    for name, stats in current.items():
+        base = baseline.get(name)
+        delta = ""
+        flag = ""
+        if base and base["p50_ms"]:
+            change = stats["p50_ms"] / base["p50_ms"] - 1
+            delta = f"{change:+.0%}"
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(name)
+        base_p50 = f"{base['p50_ms']:.3f}" if base else "-"
+        print(
+            f"{name:48} {stats['p50_ms']:10.3f} {base_p50:>10} {delta:>8} "
+            f"{stats['ops_per_s']:10.1f}{flag}"
+        )
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Nitter Timeline benchmarks")
+    parser.add_argument("--sizes", default="20,100",
+                        type=lambda v: [int(x) for x in v.split(",")],
+                        help="Items per feed to benchmark (comma separated)")
+    parser.add_argument("--feeds", type=int, default=10, help="Feeds per timeline")
+    parser.add_argument("--repeat", type=int, default=30, help="Iterations per benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="End-to-end requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="End-to-end clients")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Stub mirror latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Stub latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub 503 probability")
+    parser.add_argument("--only", help="Comma separated benchmark families to run")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Relative p50 slowdown reported as a regression")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 when a regression is found")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    # Benchmarks measure the code, not the background poller.
+    settings.poll_enabled = False
+    results = asyncio.run(run_all(args))
+    current = {r.name: r.summary() for r in results}
+    RESULTS_DIR.mkdir(exist_ok=True)
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "executor_mode": settings.executor_mode,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": current,
+    }
+    (RESULTS_DIR / "latest.json").write_text(json.dumps(payload, indent=2))
+    baseline_path = RESULTS_DIR / "baseline.json"
+    baseline = (
+        json.loads(baseline_path.read_text())["results"] if baseline_path.exists() else {}
+    )
+    regressions = compare(current, baseline, args.threshold)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(payload, indent=2))
+        print(f"baseline saved to {baseline_path}")
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,139 @@
+"""Local stub Nitter mirror serving synthetic RSS feeds.
+
+A tiny ASGI app run by uvicorn in a background thread. Every
+``/<user>/rss`` path returns a deterministic feed from
+:mod:`benchmarks.corpus`, with configurable latency, error rate and
+``ETag`` / ``304`` support.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+import uvicorn
+
+from benchmarks.corpus import make_feed, parse_path
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub mirror.
+
+    Attributes:
+        items_per_feed: Entries in each generated feed.
+        latency_ms: Added delay per request.
+        jitter_ms: Uniform random extra delay (0..jitter).
+        error_rate: Probability of answering ``503``.
+        etag: Send ``ETag`` and honour ``If-None-Match``.
+        images: ``<img>`` tags per item.
+    """
+
+    items_per_feed: int = 40
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    etag: bool = True
+    images: int = 2
+    seed: int = 0
+    requests: int = 0
+    bytes_sent: int = 0
+    _bodies: dict[str, tuple[bytes, str]] = field(default_factory=dict, repr=False)
+
+    def body(self, user: str) -> tuple[bytes, str]:
+        """Return the (cached) feed body and its ETag for ``user``."""
+        cached = self._bodies.get(user)
+        if cached is None:
+            data = make_feed(
+                user, self.items_per_feed, seed=self.seed, images=self.images
+            )
+            cached = (data, '"' + hashlib.sha1(data).hexdigest() + '"')
+            self._bodies[user] = cached
+        return cached
+
+
+class StubApp:
+    """ASGI application implementing the stub mirror."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self._rng = random.Random(config.seed)
+
+    async def __call__(self, scope, receive, send):  # type: ignore[no-untyped-def]
+        if scope["type"] != "http":
+            return
+        cfg = self.config
+        cfg.requests += 1
+        delay = cfg.latency_ms + self._rng.random() * cfg.jitter_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        user = parse_path(scope["path"])
+        if user is None:
+            await _respond(send, 404, b"not found")
+            return
+        if self._rng.random() < cfg.error_rate:
+            await _respond(send, 503, b"unavailable")
+            return
+        body, etag = cfg.body(user)
+        headers = dict(scope["headers"])
+        if cfg.etag and headers.get(b"if-none-match") == etag.encode():
+            await _respond(send, 304, b"", [(b"etag", etag.encode())])
+            return
+        extra = [(b"etag", etag.encode())] if cfg.etag else []
+        cfg.bytes_sent += len(body)
+        await _respond(send, 200, body, [(b"content-type", b"application/rss+xml"), *extra])
+
+
+async def _respond(
+    send, status: int, body: bytes, headers: list[tuple[bytes, bytes]] | None = None
+) -> None:  # type: ignore[no-untyped-def]
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-length", str(len(body)).encode()), *(headers or [])],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class StubMirror:
+    """Run :class:`StubApp` on ``127.0.0.1`` in a daemon thread.
+
+    Use as a context manager; ``base_url`` is available once entered.
+    """
+
+    def __init__(self, config: StubConfig | None = None, port: int = 0) -> None:
+        self.config = config or StubConfig()
+        self._server = uvicorn.Server(
+            uvicorn.Config(
+                StubApp(self.config),
+                host="127.0.0.1",
+                port=port,
+                log_level="warning",
+                lifespan="off",
+            )
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """``http://127.0.0.1:<port>`` of the running server."""
+        sock = self._server.servers[0].sockets[0]
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    def __enter__(self) -> StubMirror:
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("stub mirror did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
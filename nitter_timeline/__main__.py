@@ -7,12 +7,16 @@ from __future__ import annotations
 
 import argparse
 import importlib
+import logging
+import os
 import sys
 
 import uvicorn
 
 from .core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run Nitter Timeline server")
@@ -32,11 +36,38 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Enable auto-reload (dev only)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.server_workers,
+        help="Worker processes (default from settings); more than one "
+        "shares the feed cache between workers",
+    )
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:  # pragma: no cover - trivial
     args = parse_args(argv)
+    if args.workers > 1:
+        if args.reload:
+            raise SystemExit("--reload cannot be combined with --workers")
+        if "shared_cache_backend" not in settings.__fields_set__:
+            # Workers inherit the environment: share one cache by default.
+            os.environ["NT_SHARED_CACHE_BACKEND"] = "sqlite"
+        elif settings.shared_cache_backend == "none":
+            logger.warning(
+                "running %d workers without a shared cache; each fetches feeds "
+                "on its own",
+                args.workers,
+            )
+        uvicorn.run(
+            "nitter_timeline.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level="info",
+        )
+        return 0
     # Lazy import to ensure side effects (logging) happen correctly
     module = importlib.import_module("nitter_timeline.main")
     app = module.app  # type: ignore[attr-defined]
@@ -1,16 +1,72 @@
 """API route definitions for timeline endpoints."""
-from fastapi import APIRouter, Query
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 from nitter_timeline.core.config import settings
-from nitter_timeline.services.aggregator import aggregate
-from nitter_timeline.services.fetcher import fetch_many
+from nitter_timeline.core.metrics import stage
+from nitter_timeline.models.feed import AggregatedTimeline, FeedRecord
+from nitter_timeline.services.aggregator import (
+    aggregate_streams,
+    apply_rules,
+    load_feed_items,
+    load_streams,
+)
+from nitter_timeline.services.fetcher import fetch_many, iter_feeds
+from nitter_timeline.services.filters import FilterRules, compile_rules
+from nitter_timeline.services.live import hub, merged_snapshot, newer_than, sse_frame
+from nitter_timeline.services.poller import poller
+from nitter_timeline.services.response_cache import (
+    etag_matches,
+    request_key,
+    timeline_cache,
+    versions_of,
+)
+from nitter_timeline.services.schedule import schedule
+from nitter_timeline.services.serialize import dumps, items_json, parse_fields, timeline_json
+from nitter_timeline.services.timeline_index import (
+    SortKey,
+    decode_cursor,
+    encode_cursor,
+    item_key,
+)
+from nitter_timeline.services.validation import filter_feed_urls
 
 api_router = APIRouter()
 
-@api_router.get("/timeline", summary="Aggregate timeline")
+def _fields(fields: str | None) -> tuple[str, ...]:
+    try:
+        return parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _rules(
+    mute: list[str] | None, mute_author: list[str] | None, hide: str | None
+) -> FilterRules:
+    try:
+        return FilterRules.from_params(
+            mute or (), mute_author or (), hide.split(",") if hide else ()
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@api_router.get(
+    "/timeline", summary="Aggregate timeline", response_model=AggregatedTimeline
+)
 async def get_timeline(
-    feeds: list[str] | None = None,
+    feeds: Annotated[list[str] | None, Query()] = None,
     limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    fields: str | None = None,
+    mute: Annotated[list[str] | None, Query()] = None,
+    mute_author: Annotated[list[str] | None, Query()] = None,
+    hide: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """Return an aggregated, sorted timeline.
 
@@ -18,12 +74,223 @@ async def get_timeline(
         feeds: Optional repeatable feed URL(s). If omitted, the configured
             ``default_feeds`` are used.
         limit: Maximum number of items returned (default 100).
+        cursor: Opaque ``next_cursor`` / ``prev_cursor`` value from a
+            previous response.
+        fields: Comma-separated item fields to include (default: all but
+            ``raw``).
+        mute: Repeatable keyword/phrase; matching items are dropped.
+        mute_author: Repeatable author handle whose items are dropped.
+        hide: Comma-separated item kinds to drop (``replies``,
+            ``retweets``).
+
+    When background polling is enabled the feeds are served from their
+    last good snapshot and refreshed out of band, so upstream latency only
+    affects the first request for a feed.
+
+    Serialized responses are memoized per normalized request and reused
+    while every feed's content version is unchanged; they carry a strong
+    ``ETag`` and a matching ``If-None-Match`` is answered with ``304``.
 
     Returns:
-        AggregatedTimeline: JSON-serializable Pydantic model with items.
+        Response: ``AggregatedTimeline``-shaped JSON assembled from the
+        items' cached encodings.
     """
     # Using Query for limit validation; feeds left as raw list.
     # FastAPI handles parsing of repeated query params into a list.
+    selected = _fields(fields)
+    rules = _rules(mute, mute_author, hide)
+    feed_urls = feeds or settings.default_feeds
+    fetched = await _get_feeds(feed_urls)
+    key = request_key(feed_urls, limit, cursor, selected, rules)
+    versions = versions_of(fetched)
+    cached = timeline_cache.get(key, versions) if versions is not None else None
+    if cached is None:
+        # Only new entries are parsed in the CPU pool; caches, the index and
+        # the store stay in this process.
+        streams, variant = apply_rules(await load_streams(fetched), rules)
+        try:
+            timeline = aggregate_streams(
+                streams, limit=limit, cursor=cursor, variant=variant
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        with stage("serialize"):
+            body = timeline_json(timeline, selected)
+        if versions is None:
+            return Response(body, media_type="application/json")
+        cached = timeline_cache.put(key, versions, body)
+    # Let browsers keep the body but always revalidate it.
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+async def _get_feeds(feed_urls: list[str]) -> list[tuple[str, dict]]:
+    """Return requested feeds (snapshots when polling is enabled)."""
+    if settings.poll_enabled:
+        return await poller.get_many(feed_urls)
+    return await fetch_many(feed_urls)
+
+
+async def _iter_feeds(feed_urls: list[str]) -> AsyncIterator[tuple[str, dict]]:
+    """Yield requested feeds as they become available."""
+    if settings.poll_enabled:
+        async for pair in poller.iter_many(feed_urls):
+            yield pair
+    else:
+        async for pair in iter_feeds(await filter_feed_urls(feed_urls)):
+            yield pair
+
+
+def _ndjson(kind: str, **fields: object) -> bytes:
+    return dumps({"type": kind, **fields}) + b"\n"
+
+
+async def _stream_lines(
+    feed_urls: list[str], limit: int, fields: tuple[str, ...], rules: FilterRules
+) -> AsyncIterator[bytes]:
+    streams: dict[str, list[FeedRecord]] = {}
+    seen: set[str] = set()
+    compiled = compile_rules(rules)
+    async for url, parsed in _iter_feeds(feed_urls):
+        items = await load_feed_items(url, parsed)
+        if compiled is not None:
+            items = compiled.apply(url, items)
+        streams[url] = items
+        fresh = [i for i in items[:limit] if i.id not in seen]
+        seen.update(i.id for i in fresh)
+        if fresh:
+            # Items are already JSON; splice them in rather than re-encoding.
+            yield (
+                b'{"type":"items","feed":' + dumps(url)
+                + b',"items":' + items_json((r.to_item() for r in fresh), fields) + b"}\n"
+            )
+    timeline = aggregate_streams(
+        streams, limit=limit, variant=compiled.digest if compiled else ""
+    )
+    yield _ndjson(
+        "end",
+        order=[i.id for i in timeline.items],
+        next_cursor=timeline.next_cursor,
+        latest_cursor=encode_cursor("prev", item_key(timeline.items[0]))
+        if timeline.items
+        else None,
+    )
+
+
+@api_router.get("/timeline/stream", summary="Stream timeline as NDJSON")
+async def stream_timeline(
+    feeds: Annotated[list[str] | None, Query()] = None,
+    limit: int = Query(100, ge=1, le=500),
+    fields: str | None = None,
+    mute: Annotated[list[str] | None, Query()] = None,
+    mute_author: Annotated[list[str] | None, Query()] = None,
+    hide: str | None = None,
+):
+    """Stream timeline items as each feed becomes available.
+
+    Emits newline-delimited JSON objects: one ``{"type": "items", "feed":
+    ..., "items": [...]}`` line per feed (items not sent before, newest
+    first), then a final ``{"type": "end", "order": [...], "next_cursor":
+    ..., "latest_cursor": ...}`` line listing the IDs of the merged first
+    page in display order. ``next_cursor`` continues with the regular
+    ``/timeline`` endpoint; ``latest_cursor`` subscribes to
+    ``/timeline/live`` from the newest item shown.
+
+    Query Parameters:
+        feeds: Optional repeatable feed URL(s) (``default_feeds`` if
+            omitted).
+        limit: Maximum number of items in the merged page (default 100).
+        fields: Comma-separated item fields to include (default: all but
+            ``raw``).
+        mute, mute_author, hide: Filter rules (see ``/timeline``).
+
+    Returns:
+        StreamingResponse: ``application/x-ndjson`` body.
+    """
     feed_urls = feeds or settings.default_feeds
-    fetched = await fetch_many(feed_urls)
-    return aggregate(fetched, limit=limit)
+    return StreamingResponse(
+        _stream_lines(
+            feed_urls, limit, _fields(fields), _rules(mute, mute_author, hide)
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _live_events(
+    request: Request, feed_urls: list[str], since: SortKey | None, rules: FilterRules
+) -> AsyncIterator[bytes]:
+    async with hub.subscribe(feed_urls, rules) as (channel, queue):
+        if since is not None:
+            catch_up = newer_than(
+                await merged_snapshot(channel.feeds, 500, channel.rules), since
+            )
+            if catch_up:
+                yield sse_frame(catch_up)
+        while True:
+            try:
+                frame = await asyncio.wait_for(
+                    queue.get(), timeout=settings.live_keepalive_seconds
+                )
+            except TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": keepalive\n\n"
+                continue
+            yield frame
+
+
+@api_router.get("/timeline/live", summary="Live timeline updates (SSE)")
+async def live_timeline(
+    request: Request,
+    feeds: Annotated[list[str] | None, Query()] = None,
+    cursor: str | None = None,
+    mute: Annotated[list[str] | None, Query()] = None,
+    mute_author: Annotated[list[str] | None, Query()] = None,
+    hide: str | None = None,
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """Push items newer than the client's last-seen cursor as SSE events.
+
+    Each ``items`` event carries ``{"items": [...]}`` (newest first) and an
+    event ``id`` that is a cursor for its newest item. Clients watching
+    the same feed set with the same filter rules share one server-side
+    diff per upstream change.
+    Updates are driven by the background poller (``poll_enabled``).
+
+    Query Parameters:
+        feeds: Optional repeatable feed URL(s) (``default_feeds`` if
+            omitted).
+        cursor: Cursor of the newest item the client already has (e.g.
+            ``latest_cursor`` from the stream endpoint); missed items are
+            sent first. ``Last-Event-ID`` takes precedence on reconnect.
+        mute, mute_author, hide: Filter rules (see ``/timeline``).
+
+    Returns:
+        StreamingResponse: ``text/event-stream`` body.
+    """
+    rules = _rules(mute, mute_author, hide)
+    since: SortKey | None = None
+    if resume := last_event_id or cursor:
+        try:
+            _direction, since = decode_cursor(resume)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    fetched = await _get_feeds(feeds or settings.default_feeds)
+    return StreamingResponse(
+        _live_events(request, [url for url, _parsed in fetched], since, rules),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@api_router.get("/feeds/schedule", summary="Per-feed refresh schedule")
+async def feed_schedule() -> dict[str, dict]:
+    """Return the adaptive refresh statistics of every known feed.
+
+    Returns:
+        dict[str, dict]: Feed URL to its interval, estimated posting
+        interval, not-modified rate, check counts and next due time.
+    """
+    return schedule.snapshot()
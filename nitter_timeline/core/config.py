@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import BaseSettings, HttpUrl
 
@@ -12,13 +13,75 @@ class Settings(BaseSettings):
     via process environment or a local ``.env`` file for development.
 
     Attributes:
-        nitter_base_urls: Preferred Nitter mirror base URLs (failover list).
+        nitter_base_urls: Interchangeable Nitter mirror base URLs; feeds on
+            any of them are fetched from the healthiest one. Mirrors must
+            pass the same checks as feed URLs (see
+            ``allowed_feed_domain_suffixes``) or they are ignored.
         default_feeds: Initial feed URLs aggregated when none are provided
             in a request.
-        fetch_concurrency: Max concurrent network fetches (future use).
+        fetch_concurrency: Max concurrent upstream requests (all hosts).
+        fetch_per_host_concurrency: Max concurrent upstream requests to a
+            single mirror host.
         fetch_timeout_seconds: Per-request timeout.
         cache_ttl_seconds: In-memory feed cache lifetime.
+        snapshot_cache_max_bytes: Approximate memory budget of the last
+            known compact feed snapshots, and separately of the normalized
+            per-feed items (which reference snapshot entries).
+        snapshot_cache_compress: Keep snapshots zlib-compressed (less
+            memory, a decode when a snapshot is not in use elsewhere).
         user_agent: Custom UA for polite identification.
+        http_max_connections: Connection pool size of the shared client.
+        http_max_keepalive_connections: Idle connections kept open.
+        http_keepalive_expiry_seconds: Idle time before a kept-alive
+            connection is closed.
+        http2_enabled: Multiplex requests per host over HTTP/2 (requires
+            the ``http2`` extra).
+        mirror_max_attempts: Mirrors tried per fetch (failover + hedging).
+        mirror_failure_threshold: Consecutive failures opening a mirror's
+            circuit breaker.
+        mirror_cooldown_seconds: How long an open breaker skips a mirror.
+        mirror_hedge_delay_seconds: Minimum wait before racing a slow
+            request against the next mirror (``None`` disables hedging).
+        poll_enabled: Refresh tracked feeds in the background and serve
+            timeline requests from the last good snapshot.
+        poll_interval_seconds: Delay between background refresh rounds.
+        poll_recent_feed_ttl_seconds: How long a feed requested by a client
+            keeps being refreshed after its last request.
+        poll_max_tracked_feeds: Upper bound on recently requested feeds kept
+            in the refresh set.
+        refresh_min_interval_seconds: Shortest adaptive refresh interval
+            of a feed.
+        refresh_max_interval_seconds: Longest adaptive refresh interval of
+            a feed.
+        refresh_jitter: Relative random spread of refresh intervals.
+        live_keepalive_seconds: Idle interval between SSE keep-alive
+            comments on ``/api/timeline/live``.
+        executor_mode: Where feed parsing and sanitizing run: ``inline`` on
+            the event loop, or in a ``thread`` / ``process`` pool.
+        executor_workers: Pool size (``None`` lets the pool pick a default
+            based on the CPU count).
+        item_cache_size: Normalized items kept so unchanged entries are not
+            sanitized again.
+        seen_index_size: Tweets remembered by canonical status ID, so the
+            same status from another mirror or feed is not processed again.
+        store_path: SQLite database for persistent feeds/items (disabled
+            when unset).
+        store_batch_size: Buffered rows that trigger a write transaction.
+        store_history_per_feed: Stored items merged into each feed's
+            timeline beyond the current RSS window; older rows are pruned.
+        response_cache_size: Serialized ``/api/timeline`` responses kept
+            for repeated requests (validated by feed content versions).
+        shared_cache_backend: Cross-process feed cache shared by server
+            workers (``none`` or ``sqlite``).
+        shared_cache_path: SQLite file of the ``sqlite`` shared cache
+            (defaults to a file in the system temp directory).
+        shared_cache_lease_seconds: How long one worker may hold a feed's
+            refresh lease; others wait up to this long for its result.
+        server_workers: Worker processes started by the CLI.
+        metrics_enabled: Record stage timings/counters and serve them in
+            Prometheus format at ``/metrics``.
+        metrics_loop_lag_interval_seconds: Sampling period of the event
+            loop lag monitor.
     """
 
     # e.g. ["https://nitter.net"] allow multiple mirrors
@@ -26,23 +89,66 @@ class Settings(BaseSettings):
     # list of RSS feed URLs to aggregate initially
     default_feeds: list[str] = []
     fetch_concurrency: int = 5
+    fetch_per_host_concurrency: int = 2
     fetch_timeout_seconds: int = 15
     cache_ttl_seconds: int = 120
+    snapshot_cache_max_bytes: int = 64 * 1024 * 1024
+    snapshot_cache_compress: bool = False
     user_agent: str = (
         "nitter-timeline/0.1 (+https://github.com/yourname/nitter-timeline)"
     )
+    # HTTP client pool
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = False
+    # Mirror failover
+    mirror_max_attempts: int = 3
+    mirror_failure_threshold: int = 3
+    mirror_cooldown_seconds: float = 60.0
+    mirror_hedge_delay_seconds: float | None = 1.5
+    # Background polling
+    poll_enabled: bool = True
+    poll_interval_seconds: int = 60
+    poll_recent_feed_ttl_seconds: int = 900
+    poll_max_tracked_feeds: int = 256
+    # Adaptive per-feed refresh intervals (cache_ttl_seconds until known)
+    refresh_min_interval_seconds: float = 60.0
+    refresh_max_interval_seconds: float = 3600.0
+    refresh_jitter: float = 0.1
+    live_keepalive_seconds: int = 15
+    # CPU-bound work (feedparser / bleach)
+    executor_mode: Literal["inline", "thread", "process"] = "thread"
+    executor_workers: int | None = None
+    # Persistent item store (SQLite, optional)
+    store_path: str | None = None
+    store_batch_size: int = 200
+    store_history_per_feed: int = 500
+    response_cache_size: int = 256
+    # Cross-process cache shared by server workers
+    shared_cache_backend: Literal["none", "sqlite"] = "none"
+    shared_cache_path: str | None = None
+    shared_cache_lease_seconds: float = 30.0
+    # Observability
+    metrics_enabled: bool = False
+    metrics_loop_lag_interval_seconds: float = 0.5
     # Server
     server_host: str = "127.0.0.1"
     server_port: int = 8000
+    server_workers: int = 1
     # Security related
     max_feeds_per_request: int = 10
     allowed_feed_schemes: tuple[str, ...] = ("https", "http")
     enforce_https_feeds: bool = True
     sanitize_html: bool = True
     max_images_per_item: int = 4
+    item_cache_size: int = 10000
+    seen_index_size: int = 50000
     # Basic allow list of allowed domains suffixes
     # wildcard semantics: domain endswith(suffix)
     allowed_feed_domain_suffixes: list[str] = ["nitter.net", "nitter.pufe.org"]
+    # How long a host's "resolves to public addresses only" verdict is reused
+    dns_cache_ttl_seconds: int = 300
     # Security headers
     security_headers_enabled: bool = True
     # Temporary allowance for inline scripts until JS extracted
@@ -0,0 +1,266 @@
+"""Minimal Prometheus-format metrics registry.
+
+Metrics are cheap, lock-protected in-process counters/histograms rendered
+in the Prometheus text exposition format by ``/metrics``. When
+``metrics_enabled`` is off every update returns immediately and
+:func:`stage` hands out a shared no-op context manager, so
+instrumentation on the hot path costs a single attribute check.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager
+
+from nitter_timeline.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Return the sample lines of this metric (without the header)."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Add ``amount`` to the series identified by ``labels``."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the series identified by ``labels`` to ``value``."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+        # label values -> (bucket counts, sum, count)
+        self._series: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record ``value`` in the series identified by ``labels``."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(k, (list(s[0]), s[1], s[2])) for k, s in self._series.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts, strict=True):
+                cumulative += n
+                le = _labels(self.labelnames, key, f'le="{_fmt(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors.
+
+    Attributes:
+        enabled: Whether updates are recorded (from ``metrics_enabled``).
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """Register a callable producing metrics at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text format."""
+        lines: list[str] = []
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            try:
+                metrics.extend(collector())
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("metrics collector failed")
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(enabled=settings.metrics_enabled)
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    """Create and register a :class:`Counter`."""
+    metric = Counter(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+    """Create and register a :class:`Gauge`."""
+    metric = Gauge(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Histogram:
+    """Create and register a :class:`Histogram`."""
+    metric = Histogram(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def sample(
+    metric_cls: type[Counter],
+    name: str,
+    documentation: str,
+    values: dict[LabelValues, float],
+    labelnames: Iterable[str] = (),
+) -> Counter:
+    """Build an unregistered counter/gauge holding ``values`` (for collectors).
+
+    Lets modules expose counters they already maintain without updating
+    a second copy on the hot path.
+    """
+    metric = metric_cls(name, documentation, labelnames)
+    metric._values = dict(values)  # pylint: disable=protected-access
+    return metric
+
+
+STAGE_SECONDS = histogram(
+    "nt_stage_duration_seconds",
+    "Time spent per processing stage.",
+    ("stage",),
+)
+FETCH_SECONDS = histogram(
+    "nt_fetch_duration_seconds",
+    "Upstream request latency per mirror.",
+    ("mirror", "outcome"),
+)
+FETCH_BYTES = counter(
+    "nt_fetch_bytes_total", "Response bytes downloaded per mirror.", ("mirror",)
+)
+CACHE_REQUESTS = counter(
+    "nt_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result")
+)
+LOOP_LAG = histogram("nt_event_loop_lag_seconds", "Event loop scheduling lag.")
+
+_NOOP: AbstractContextManager[None] = contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def _timer(stage_name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage_name)
+
+
+def stage(stage_name: str) -> AbstractContextManager[None]:
+    """Time the enclosed block as processing stage ``stage_name``."""
+    if not registry.enabled:
+        return _NOOP
+    return _timer(stage_name)
+
+
+async def monitor_loop_lag(interval: float = 0.5) -> None:
+    """Sample event loop lag forever (run as a background task)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
@@ -1,16 +1,58 @@
 """Application entry point exposing the FastAPI instance."""
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from nitter_timeline.api.routes import api_router
-from nitter_timeline.core.config import settings as _settings  # noqa: F401
+from nitter_timeline.core.config import settings
 from nitter_timeline.core.logging import configure_logging
+from nitter_timeline.core.metrics import monitor_loop_lag, registry
 from nitter_timeline.core.security import add_security_middleware
+from nitter_timeline.services.executor import shutdown_executor
+from nitter_timeline.services.fetcher import close_client, warm_start
+from nitter_timeline.services.mirrors import pool as mirror_pool
+from nitter_timeline.services.poller import poller
+from nitter_timeline.services.shared_cache import close_shared_cache
+from nitter_timeline.services.store import close_store
 from nitter_timeline.web.pages import page_router
 
 configure_logging()
 
-app = FastAPI(title="Nitter Timeline", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Start background services on startup and release them on shutdown."""
+    await mirror_pool.validate()
+    await warm_start()
+    if settings.poll_enabled:
+        poller.start()
+    lag_monitor = (
+        asyncio.create_task(
+            monitor_loop_lag(settings.metrics_loop_lag_interval_seconds)
+        )
+        if registry.enabled
+        else None
+    )
+    try:
+        yield
+    finally:
+        if lag_monitor is not None:
+            lag_monitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await lag_monitor
+        await poller.stop()
+        await close_client()
+        shutdown_executor()
+        close_store()
+        close_shared_cache()
+
+
+app = FastAPI(title="Nitter Timeline", version="0.1.0", lifespan=lifespan)
 add_security_middleware(app)
 
 app.include_router(page_router)
@@ -31,3 +73,20 @@ async def health() -> dict:
         dict: ``{"status": "ok"}`` when application is responsive.
     """
     return {"status": "ok"}
+
+
+@app.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Expose counters and timing histograms in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Exposition format ``0.0.4`` payload.
+
+    Raises:
+        HTTPException: ``404`` when ``metrics_enabled`` is off.
+    """
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="metrics disabled")
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,9 +1,10 @@
 """Data models for timeline feed items."""
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, PrivateAttr
 
 
 class FeedItem(BaseModel):  # pylint: disable=too-few-public-methods
@@ -19,6 +20,7 @@ class FeedItem(BaseModel):  # pylint: disable=too-few-public-methods
         published: Parsed publication datetime (UTC assumed if naive).
         avatar_url: Optional avatar image URL (future enhancement field).
         raw: Original feed entry mapping (for debugging / future parsing).
+            Omitted from API responses unless selected via ``fields``.
     """
 
     id: str
@@ -30,17 +32,76 @@ class FeedItem(BaseModel):  # pylint: disable=too-few-public-methods
     published: datetime | None = None
     avatar_url: HttpUrl | None = None
     raw: dict | None = None
+    # Encoded JSON per field selection (see services.serialize).
+    _json_cache: dict[tuple[str, ...], bytes] = PrivateAttr(default_factory=dict)
+
+    class Config:  # pylint: disable=too-few-public-methods
+        # Items are immutable in practice; embedding them in a timeline
+        # must not copy them.
+        copy_on_model_validation = "none"
 
 
 class AggregatedTimeline(BaseModel):  # pylint: disable=too-few-public-methods
-    """Container for a slice of timeline items with (future) cursors.
+    """Container for a slice of timeline items with pagination cursors.
 
     Attributes:
         items: Ordered feed items (newest first).
-        next_cursor: Opaque cursor for fetching the next page (TODO).
-        prev_cursor: Opaque cursor for fetching the previous page (TODO).
+        next_cursor: Opaque cursor for fetching the next (older) page.
+        prev_cursor: Opaque cursor for fetching the previous (newer) page.
     """
 
     items: list[FeedItem]
     next_cursor: str | None = None
     prev_cursor: str | None = None
+
+
+@dataclass(slots=True, eq=True)
+class FeedRecord:
+    """Compact internal item used by caches, indexes and merging.
+
+    Mirrors :class:`FeedItem` without pydantic validation; the model is
+    built (and memoized) only for items that end up in a response.
+
+    Attributes:
+        id: Stable synthetic identifier.
+        author: Display name or handle (interned; repeats across items).
+        author_url: Optional link to the author's profile.
+        content_html: Sanitized renderable HTML.
+        summary: Plain-text / summary fallback content.
+        link: Permalink to the original post.
+        published: Publication datetime.
+        avatar_url: Optional avatar image URL.
+        kind: ``post``, ``reply`` or ``retweet`` (used by filter rules).
+        text: Plain text of the content, without markup; computed on
+            first use by keyword filter rules (``None`` until then).
+        raw: Original feed entry mapping.
+    """
+
+    id: str
+    author: str
+    author_url: str | None = None
+    content_html: str = ""
+    summary: str | None = None
+    link: str | None = None
+    published: datetime | None = None
+    avatar_url: str | None = None
+    kind: str = "post"
+    text: str | None = field(default=None, repr=False, compare=False)
+    raw: dict | None = field(default=None, repr=False)
+    _item: FeedItem | None = field(default=None, repr=False, compare=False)
+
+    def to_item(self) -> FeedItem:
+        """Return the validated API model for this record (built once)."""
+        if self._item is None:
+            self._item = FeedItem(
+                id=self.id,
+                author=self.author,
+                author_url=self.author_url,
+                content_html=self.content_html,
+                summary=self.summary,
+                link=self.link,
+                published=self.published,
+                avatar_url=self.avatar_url,
+                raw=self.raw,
+            )
+        return self._item
@@ -2,32 +2,87 @@
 
 Takes multiple parsed RSS feeds (dicts from feedparser) and produces
 de-duplicated, chronologically sorted timeline items.
+
+The async entry points (:func:`load_feed_items`, :func:`load_streams`)
+keep every cache, the timeline index and the store in the calling
+process and hand only the pure per-entry work (:func:`parse_entries`) to
+the CPU pool, so ``executor_mode=process`` pickles new entries only.
 """
 from __future__ import annotations
 
+import asyncio
 import hashlib
-from collections.abc import Sequence
+import heapq
+import re
+import sys
+import threading
+from collections.abc import Iterable, Mapping, Sequence
 
-from dateutil import parser as dateparser
+from cachetools import LRUCache
 
 from nitter_timeline.core.config import settings
-from nitter_timeline.models.feed import AggregatedTimeline, FeedItem
+from nitter_timeline.core.metrics import CACHE_REQUESTS, Counter, Gauge, registry, sample, stage
+from nitter_timeline.models.feed import AggregatedTimeline, FeedRecord
+from nitter_timeline.services.dates import entry_published
+from nitter_timeline.services.executor import run_cpu
+from nitter_timeline.services.filters import FilterRules, compile_rules
 from nitter_timeline.services.sanitize import sanitize_html
+from nitter_timeline.services.snapshots import estimate_size
+from nitter_timeline.services.store import get_store
+from nitter_timeline.services.timeline_index import (
+    decode_cursor,
+    encode_cursor,
+    get_index,
+    item_key,
+)
+
+# (item id, content hash) -> normalized item
+_item_cache: LRUCache = LRUCache(maxsize=settings.item_cache_size)
+# feed url -> (parsed feed object, its normalized items, approximate bytes).
+# Records reference their snapshot's entries (``raw``), so this is bounded
+# by the snapshot byte budget too; otherwise evicted snapshots stay alive.
+_feed_items: LRUCache = LRUCache(
+    maxsize=settings.snapshot_cache_max_bytes, getsizeof=lambda value: value[2]
+)
+# (status ID, kind, content hash) -> normalized item, shared by every
+# mirror and feed
+_seen_statuses: LRUCache = LRUCache(maxsize=settings.seen_index_size)
+# cachetools caches are not thread-safe; sync callers may run in a pool.
+_cache_lock = threading.Lock()
+_STATUS_RE = re.compile(r"/status(?:es)?/(\d+)")
+
+
+def _status_id(entry: dict) -> str | None:
+    """Extract the numeric tweet ID from a Nitter entry's link or guid.
+
+    The ID is the same on every mirror and for retweets of the status,
+    unlike the link host or the entry title.
+    """
+    for field in ("link", "guid", "id"):
+        value = entry.get(field)
+        if value and (match := _STATUS_RE.search(value)):
+            return match.group(1)
+    return None
 
 
 def _make_id(entry: dict) -> str:
-    """Construct a stable synthetic identifier for a feed entry.
+    """Construct a stable identifier for a feed entry.
 
-    Concatenates several candidate uniqueness fields (guid/id/link/title)
-    and hashes them with SHA-256 (truncated for brevity) to mitigate
-    collisions while providing deterministic IDs for de-duplication.
+    Nitter entries are identified by their numeric status ID, so the same
+    tweet fetched from different mirrors or retweeted into several feeds
+    gets one ID. Other entries fall back to hashing several candidate
+    uniqueness fields (guid/id/link/title) with SHA-256 (truncated for
+    brevity) to mitigate collisions while providing deterministic IDs for
+    de-duplication.
 
     Args:
         entry: Raw feed entry mapping from *feedparser*.
 
     Returns:
-    str: 24-character hex digest identifier.
+    str: Status ID, or a 24-character hex digest identifier.
     """
+    if (status := _status_id(entry)) is not None:
+        return status
     parts = [
         entry.get("id"),
         entry.get("guid"),
@@ -38,103 +93,385 @@ def _make_id(entry: dict) -> str:
     return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
 
 
-def parse_items(parsed_feed: dict) -> list[FeedItem]:
-    """Convert a parsed feed dictionary into `FeedItem` objects.
+def _content_hash(entry: dict, links: bool = True) -> str:
+    """Digest the entry fields that feed into a :class:`FeedRecord`.
+
+    Used together with the entry identity as the item cache key, so an
+    entry edited upstream (same guid, new content) is processed again.
+
+    Args:
+        entry: Raw feed entry mapping.
+        links: Include the permalink and author URL. Status entries leave
+            them out since they name the mirror host, not the content.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    content = entry.get("content")
+    fields = [
+        content[0].get("value", "") if content else None,
+        entry.get("summary"),
+        entry.get("published") or entry.get("updated"),
+        entry.get("author"),
+    ]
+    if links:
+        fields += [(entry.get("author_detail") or {}).get("href"), entry.get("link")]
+    for value in fields:
+        digest.update((value or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _entry_kind(entry: dict) -> str:
+    """Classify a Nitter entry by its title prefix (``R to`` / ``RT by``)."""
+    title = entry.get("title") or ""
+    if title.startswith("RT by "):
+        return "retweet"
+    if title.startswith("R to "):
+        return "reply"
+    return "post"
+
+
+def _parse_entry(e: dict, item_id: str) -> FeedRecord:
+    """Normalize a single feed entry (date, sanitized HTML, links)."""
+    published = entry_published(e)
+    content_html = ""
+    if e.get("content"):
+        first = e["content"][0]
+        content_html = first.get("value", "")
+    else:
+        content_html = e.get("summary", "")
+    if settings.sanitize_html:
+        max_images = settings.max_images_per_item
+        with stage("sanitize"):
+            content_html = sanitize_html(
+                content_html, max_images if max_images >= 0 else None
+            )
+    return FeedRecord(
+        id=item_id,
+        author=sys.intern(e.get("author", "unknown")),
+        author_url=e.get("author_detail", {}).get("href")
+        if e.get("author_detail")
+        else None,
+        content_html=content_html,
+        summary=e.get("summary"),
+        link=e.get("link"),
+        published=published,
+        avatar_url=None,
+        kind=_entry_kind(e),
+        raw=e,
+    )
+
+
+def parse_entries(entries: list[tuple[dict, str]]) -> list[FeedRecord]:
+    """Normalize ``(entry, item_id)`` pairs without touching any cache.
+
+    Pure function of its arguments, so it can run in a worker process.
+    """
+    return [_parse_entry(e, item_id) for e, item_id in entries]
+
+
+def _lookup(
+    entries: list[dict],
+) -> tuple[list[FeedRecord | None], list[tuple[int, LRUCache, tuple]]]:
+    """Resolve entries from the item caches.
+
+    Returns:
+        The items in entry order (``None`` for misses) and the misses as
+        ``(position, cache, key)``.
+    """
+    items: list[FeedRecord | None] = []
+    misses: list[tuple[int, LRUCache, tuple]] = []
+    for pos, e in enumerate(entries):
+        status = _status_id(e)
+        if status is not None:
+            # Retweets keep their own record so kind-based rules still apply.
+            cache, key = _seen_statuses, (
+                status,
+                _entry_kind(e),
+                _content_hash(e, links=False),
+            )
+        else:
+            cache, key = _item_cache, (_make_id(e), _content_hash(e))
+        with _cache_lock:
+            item = cache.get(key)
+        if item is None:
+            misses.append((pos, cache, key))
+        items.append(item)
+    return items, misses
+
+
+def _install(
+    items: list[FeedRecord | None],
+    misses: list[tuple[int, LRUCache, tuple]],
+    parsed: list[FeedRecord],
+) -> list[FeedRecord]:
+    """Cache freshly parsed records and fill them into ``items``."""
+    with _cache_lock:
+        for (pos, cache, key), item in zip(misses, parsed, strict=True):
+            cache[key] = items[pos] = item
+    CACHE_REQUESTS.inc("item", "miss", amount=len(misses))
+    CACHE_REQUESTS.inc("item", "hit", amount=len(items) - len(misses))
+    return items  # type: ignore[return-value]
+
+
+def parse_items(parsed_feed: dict) -> list[FeedRecord]:
+    """Convert a parsed feed dictionary into `FeedRecord` objects.
 
     Extracts publication timestamp, author, HTML content (preferring the
     first ``content`` block then falling back to ``summary``), and builds a
-    normalized representation used by the UI layer.
+    normalized representation used by the UI layer. Nitter statuses are
+    looked up by their canonical status ID first, so a tweet already seen
+    via another mirror or feed is reused without sanitizing it again;
+    other items are memoized by entry identity. Both keys include a
+    content hash, so only new or changed entries are sanitized and
+    validated again.
 
     Args:
         parsed_feed: Structure returned by *feedparser.parse*.
 
     Returns:
-        list[FeedItem]: Normalized feed items (may be empty).
+        list[FeedRecord]: Normalized feed items (may be empty).
     """
-    items: list[FeedItem] = []
-    feed_entries = parsed_feed.get("entries", [])
-    for e in feed_entries:
-        published = None
-        if dt := e.get("published") or e.get("updated"):
-            try:
-                published = dateparser.parse(dt)
-            except Exception:  # pylint: disable=broad-except
-                # fall back to None; downstream sorts handle it
-                published = None
-        content_html = ""
-        if e.get("content"):
-            first = e["content"][0]
-            content_html = first.get("value", "")
-        else:
-            content_html = e.get("summary", "")
-        if settings.sanitize_html:
-            content_html = sanitize_html(content_html)
-            # Enforce max images per item if configured
-            if settings.max_images_per_item >= 0:
-                import re
-                img_pattern = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
-                imgs = img_pattern.findall(content_html)
-                if len(imgs) > settings.max_images_per_item:
-                    keep_set = set(imgs[: settings.max_images_per_item])
-                    new_parts: list[str] = []
-                    kept = 0
-                    last_end = 0
-                    for m in img_pattern.finditer(content_html):
-                        new_parts.append(content_html[last_end:m.start()])
-                        tag = m.group(0)
-                        if (
-                            tag in keep_set
-                            and kept < settings.max_images_per_item
-                        ):
-                            new_parts.append(tag)
-                            kept += 1
-                        last_end = m.end()
-                    new_parts.append(content_html[last_end:])
-                    content_html = "".join(new_parts)
-        items.append(
-            FeedItem(
-                id=_make_id(e),
-                author=e.get("author", "unknown"),
-                author_url=e.get("author_detail", {}).get("href")
-                if e.get("author_detail")
-                else None,
-                content_html=content_html,
-                summary=e.get("summary"),
-                link=e.get("link"),
-                published=published,
-                avatar_url=None,
-                raw=e,
-            )
-        )
+    entries = parsed_feed.get("entries", [])
+    items, misses = _lookup(entries)
+    parsed = parse_entries([(entries[pos], key[0]) for pos, _c, key in misses])
+    return _install(items, misses, parsed)
+
+
+def _cached_feed_items(url: str, parsed_feed: dict) -> list[FeedRecord] | None:
+    with _cache_lock:
+        cached = _feed_items.get(url)
+    if cached is not None and cached[0] is parsed_feed:
+        CACHE_REQUESTS.inc("feed_items", "hit")
+        return cached[1]
+    CACHE_REQUESTS.inc("feed_items", "miss")
+    return None
+
+
+def _with_history(url: str, items: list[FeedRecord]) -> list[FeedRecord]:
+    """Save ``items`` and append older stored items of ``url`` (blocking)."""
+    if (store := get_store()) is None:
+        return items
+    store.add_items(url, items)
+    live_ids = {item.id for item in items}
+    history = store.history(url, settings.store_history_per_feed)
+    return items + [h for h in history if h.id not in live_ids]
+
+
+def _feed_items_size(parsed_feed: dict, items: list[FeedRecord]) -> int:
+    """Approximate the memory pinned by a :data:`_feed_items` entry."""
+    return estimate_size(parsed_feed) + sum(
+        sys.getsizeof(i) + len(i.content_html) + len(i.text or "") for i in items
+    )
+
+
+def _finish_feed_items(
+    url: str, parsed_feed: dict, items: list[FeedRecord]
+) -> list[FeedRecord]:
+    with stage("sort"):
+        items.sort(key=item_key)
+    size = _feed_items_size(parsed_feed, items)
+    with _cache_lock:
+        try:
+            _feed_items[url] = (parsed_feed, items, size)
+        except ValueError:  # larger than the whole budget
+            _feed_items.pop(url, None)
     return items
 
 
+def feed_items(url: str, parsed_feed: dict) -> list[FeedRecord]:
+    """Return the normalized items of one feed, newest first.
+
+    The fetcher hands out the same parsed object while a feed is unchanged
+    (fresh cache hit or ``304``), so an identity check is enough to skip
+    the per-entry work and the sort entirely. With a persistent store the
+    items are saved and older stored items of the feed are appended.
+
+    Args:
+        url: Feed URL (cache key).
+        parsed_feed: Structure returned by *feedparser.parse*.
+
+    Returns:
+        list[FeedRecord]: Normalized feed items in index order (``published``
+        descending, then ID; may be empty).
+    """
+    if (cached := _cached_feed_items(url, parsed_feed)) is not None:
+        return cached
+    with stage("normalize"):
+        items = parse_items(parsed_feed)
+    return _finish_feed_items(url, parsed_feed, _with_history(url, items))
+
+
+async def load_feed_items(url: str, parsed_feed: dict) -> list[FeedRecord]:
+    """Async :func:`feed_items` for the event loop.
+
+    Cache lookups and the sort stay in this process; only entries missing
+    from the item caches are sent to the CPU pool (:func:`run_cpu`), and
+    store I/O runs in a thread.
+    """
+    if (cached := _cached_feed_items(url, parsed_feed)) is not None:
+        return cached
+    entries = parsed_feed.get("entries", [])
+    with stage("normalize"):
+        items, misses = _lookup(entries)
+        parsed: list[FeedRecord] = []
+        if misses:
+            parsed = await run_cpu(
+                parse_entries, [(entries[pos], key[0]) for pos, _c, key in misses]
+            )
+        records = _install(items, misses, parsed)
+    if get_store() is not None:
+        records = await asyncio.to_thread(_with_history, url, records)
+    return _finish_feed_items(url, parsed_feed, records)
+
+
+async def load_streams(
+    feeds: Sequence[tuple[str, dict]],
+) -> dict[str, list[FeedRecord]]:
+    """Return :func:`load_feed_items` for each ``(url, parsed)`` pair."""
+    loaded = await asyncio.gather(*(load_feed_items(url, p) for url, p in feeds))
+    return dict(zip((url for url, _p in feeds), loaded, strict=True))
+
+
+def merge_top(
+    streams: Iterable[list[FeedRecord]], limit: int
+) -> list[FeedRecord]:
+    """K-way merge pre-sorted item lists, keeping the first ``limit`` unique.
+
+    Duplicates (same synthetic ID) are dropped during the merge, keeping
+    the first occurrence. The merge stops as soon as ``limit`` items are
+    collected, so the cost grows with ``limit`` and the number of streams
+    rather than the total number of entries.
+
+    Args:
+        streams: Item lists each sorted newest first.
+        limit: Maximum number of items to return.
+
+    Returns:
+        list[FeedRecord]: Up to ``limit`` unique items, newest first.
+    """
+    out: list[FeedRecord] = []
+    if limit <= 0:
+        return out
+    seen: set[str] = set()
+    for item in heapq.merge(*streams, key=item_key):
+        if item.id in seen:
+            continue
+        seen.add(item.id)
+        out.append(item)
+        if len(out) >= limit:
+            break
+    return out
+
+
 def aggregate(
     feeds: Sequence[tuple[str, dict]],
     limit: int = 100,
+    cursor: str | None = None,
+    rules: FilterRules | None = None,
 ) -> AggregatedTimeline:
     """Aggregate multiple parsed feeds into a single timeline.
 
     Steps:
-      1. Flatten all entries.
-    2. De-duplicate by synthetic ID.
-      3. Sort descending by published timestamp (missing dates treated as 0).
-      4. Truncate to ``limit``.
+      1. Normalize each feed into a newest-first item list (cached).
+      2. Drop items matching ``rules`` in one pass per feed (cached).
+      3. K-way merge the lists, de-duplicating by synthetic ID.
+      4. Stop after ``limit`` unique items (missing dates sort last).
+
+    The first page is merged directly; pages addressed by ``cursor`` are
+    served from the feed set's :class:`TimelineIndex` with a binary search.
 
     Args:
         feeds: Sequence of ``(url, parsed_feed_dict)`` pairs.
         limit: Maximum number of timeline items to include.
+        cursor: Opaque cursor from a previous response's ``next_cursor``
+            or ``prev_cursor``.
+        rules: Optional filter rules (muted keywords/authors, hidden
+            replies/retweets).
+
+    Returns:
+        AggregatedTimeline: Timeline slice containing up to ``limit`` items.
+
+    Raises:
+        ValueError: If ``cursor`` is malformed.
+    """
+    streams = {url: feed_items(url, parsed) for url, parsed in feeds}
+    streams, variant = apply_rules(streams, rules)
+    return aggregate_streams(streams, limit=limit, cursor=cursor, variant=variant)
+
+
+def apply_rules(
+    streams: Mapping[str, list[FeedRecord]], rules: FilterRules | None
+) -> tuple[Mapping[str, list[FeedRecord]], str]:
+    """Filter each feed's items by ``rules`` (cached per feed).
+
+    Returns:
+        The filtered streams and the index ``variant`` to pass to
+        :func:`aggregate_streams` (empty without rules).
+    """
+    compiled = compile_rules(rules) if rules else None
+    if compiled is None:
+        return streams, ""
+    with stage("filter"):
+        filtered = {url: compiled.apply(url, items) for url, items in streams.items()}
+    return filtered, compiled.digest
+
+
+def aggregate_streams(
+    streams: Mapping[str, list[FeedRecord]],
+    limit: int = 100,
+    cursor: str | None = None,
+    variant: str = "",
+) -> AggregatedTimeline:
+    """Build a timeline page from already normalized per-feed item lists.
+
+    Args:
+        streams: Feed URL to its items as returned by :func:`feed_items`.
+        limit: Maximum number of timeline items to include.
+        cursor: Opaque pagination cursor (see :func:`aggregate`).
+        variant: Distinguishes differently filtered views of the same
+            feed set in the index cache (e.g. a rules digest).
 
     Returns:
         AggregatedTimeline: Timeline slice containing up to ``limit`` items.
+
+    Raises:
+        ValueError: If ``cursor`` is malformed.
     """
-    all_items: list[FeedItem] = []
-    for _url, parsed in feeds:
-        all_items.extend(parse_items(parsed))
-
-    # Deduplicate by id (later: pick earliest/latest deterministically)
-    uniq: dict[str, FeedItem] = {item.id: item for item in all_items}
-    sorted_items = sorted(
-        uniq.values(), key=lambda x: (x.published or 0), reverse=True
+    with stage("merge"):
+        if cursor is None:
+            items = merge_top(streams.values(), limit + 1)
+            has_next = len(items) > limit
+            items = items[:limit]
+            has_prev = False
+        else:
+            direction, key = decode_cursor(cursor)
+            index = get_index(streams, variant)
+            items, more = index.page(direction, key, limit)
+            has_next = more if direction == "next" else bool(items)
+            has_prev = more if direction == "prev" else bool(items)
+    with stage("validate"):
+        # Only the returned page pays for pydantic validation.
+        models = [r.to_item() for r in items]
+    return AggregatedTimeline(
+        items=models,
+        next_cursor=encode_cursor("next", item_key(items[-1]))
+        if has_next and items
+        else None,
+        prev_cursor=encode_cursor("prev", item_key(items[0]))
+        if has_prev and items
+        else None,
     )
-    return AggregatedTimeline(items=sorted_items[:limit])
+
+
+def _collect() -> list[Counter]:
+    with _cache_lock:
+        size, entries = _feed_items.currsize, len(_feed_items)
+    return [
+        sample(Gauge, "nt_feed_items_cache_bytes",
+               "Approximate bytes pinned by normalized per-feed items.", {(): size}),
+        sample(Gauge, "nt_feed_items_cache_entries",
+               "Feeds with cached normalized items.", {(): entries}),
+    ]
+
+
+registry.add_collector(_collect)
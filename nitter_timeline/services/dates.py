@@ -0,0 +1,69 @@
+"""Publication date normalization for feed entries.
+
+Nitter sends RFC 822 dates and *feedparser* already exposes them as UTC
+``struct_time`` values (``published_parsed``), so the generic *dateutil*
+parser is only needed for unusual inputs. Every result is a timezone-aware
+UTC ``datetime`` so items from different feeds always compare.
+"""
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+from dateutil import parser as dateparser
+
+
+def to_utc(value: datetime) -> datetime:
+    """Return ``value`` as an aware UTC datetime (naive means UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def parse_date(text: str) -> datetime | None:
+    """Parse a date string: RFC 822, then ISO 8601, then *dateutil*.
+
+    Args:
+        text: Raw date value from the feed.
+
+    Returns:
+        datetime | None: Aware UTC datetime, or ``None`` if unparseable.
+    """
+    try:
+        return to_utc(parsedate_to_datetime(text))
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return to_utc(datetime.fromisoformat(text))
+    except ValueError:
+        pass
+    try:
+        return to_utc(dateparser.parse(text))
+    except (ValueError, OverflowError):
+        return None
+
+
+def entry_published(entry: dict) -> datetime | None:
+    """Return the entry's publication (or update) time in UTC.
+
+    Prefers the ``published_parsed`` / ``updated_parsed`` structs produced
+    by *feedparser* and only parses the raw string when they are missing.
+
+    Args:
+        entry: Raw feed entry mapping from *feedparser*.
+
+    Returns:
+        datetime | None: Aware UTC datetime, or ``None`` when absent or
+        unparseable.
+    """
+    for key in ("published_parsed", "updated_parsed"):
+        parsed = entry.get(key)
+        if isinstance(parsed, time.struct_time | tuple) and len(parsed) >= 6:
+            try:
+                return datetime(*parsed[:6], tzinfo=UTC)
+            except (TypeError, ValueError):
+                break
+    if text := entry.get("published") or entry.get("updated"):
+        return parse_date(text)
+    return None
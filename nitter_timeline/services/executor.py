@@ -0,0 +1,62 @@
+"""Executor pool for CPU-bound parsing and sanitizing work.
+
+``executor_mode`` selects where :func:`run_cpu` executes its callable:
+
+* ``inline``: directly on the event loop (no pool; useful for debugging).
+* ``thread``: a shared :class:`~concurrent.futures.ThreadPoolExecutor`.
+* ``process``: a :class:`~concurrent.futures.ProcessPoolExecutor`; the
+  callable, its arguments and its result must be picklable.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from nitter_timeline.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Executor | None = None
+
+
+def get_executor() -> Executor | None:
+    """Return the shared pool for the configured mode (``None`` if inline)."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is None and settings.executor_mode != "inline":
+        if settings.executor_mode == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.executor_workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.executor_workers,
+                thread_name_prefix="nt-cpu",
+            )
+    return _executor
+
+
+async def run_cpu(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run ``func(*args, **kwargs)`` according to ``executor_mode``.
+
+    Args:
+        func: Module-level callable (must be picklable in process mode).
+        *args: Positional arguments forwarded to ``func``.
+        **kwargs: Keyword arguments forwarded to ``func``.
+
+    Returns:
+        T: Whatever ``func`` returns.
+    """
+    executor = get_executor()
+    if executor is None:
+        return func(*args, **kwargs)
+    call = functools.partial(func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+def shutdown_executor() -> None:
+    """Shut the pool down (called on application shutdown)."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
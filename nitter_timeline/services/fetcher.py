@@ -1,28 +1,96 @@
 """Async feed fetching utilities.
 
 Responsible for retrieving individual or multiple RSS feeds concurrently
-with a small in-memory TTL cache to reduce network load.
+with a small in-memory TTL cache to reduce network load. Expired entries
+are revalidated with conditional GETs (``If-None-Match`` /
+``If-Modified-Since``) so unchanged feeds cost a header-only round trip.
+Concurrent fetches of the same URL are coalesced into one upstream request.
+Feeds hosted on a configured mirror fail over (and hedge slow requests)
+across ``nitter_base_urls`` ranked by :mod:`.mirrors` health scores.
+Fresh entries expire after their feed's adaptive refresh interval (see
+:mod:`.schedule`) rather than one global TTL.
+With a :mod:`.shared_cache` backend, worker processes publish downloads to
+each other and take a per-feed lease so only one of them refreshes a feed.
 """
 
 from __future__ import annotations
 
 import asyncio
-import ipaddress
+import hashlib
+import importlib.util
 import logging
-import socket
-from collections.abc import Iterable
-from urllib.parse import urlparse
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from urllib.parse import urlsplit
 
 import feedparser
 import httpx
-from cachetools import TTLCache
+from cachetools import TLRUCache
 
 from nitter_timeline.core.config import settings
+from nitter_timeline.core.metrics import (
+    CACHE_REQUESTS,
+    FETCH_BYTES,
+    FETCH_SECONDS,
+    Counter,
+    Gauge,
+    registry,
+    sample,
+    stage,
+)
+from nitter_timeline.services.executor import run_cpu
+from nitter_timeline.services.mirrors import pool as mirror_pool
+from nitter_timeline.services.schedule import schedule
+from nitter_timeline.services.shared_cache import (
+    SharedCache,
+    SharedEntry,
+    get_shared_cache,
+)
+from nitter_timeline.services.snapshots import CachedFeed, SnapshotCache, compact_feed
+from nitter_timeline.services.store import get_store
+from nitter_timeline.services.validation import filter_feed_urls
 
 logger = logging.getLogger(__name__)
 
-_cache: TTLCache = TTLCache(maxsize=512, ttl=settings.cache_ttl_seconds)
+
+@dataclass(slots=True)
+class FetchStats:
+    """Process-wide fetch counters.
+
+    Attributes:
+        fetches: Upstream fetch-and-parse tasks started.
+        coalesced: Calls that joined an already in-flight fetch.
+    """
+
+    fetches: int = 0
+    coalesced: int = 0
+
+
+# Freshness markers (URL -> content version): a fresh feed is served from
+# ``_validators`` without network traffic until its adaptive refresh
+# interval runs out.
+_cache: TLRUCache = TLRUCache(
+    maxsize=4096, ttu=lambda url, _version, now: now + schedule.fresh_for(url)
+)
+# Last known compact snapshot per URL (outlives freshness) used for
+# stale serving and revalidation; bounded by bytes, not entries.
+_validators: SnapshotCache = SnapshotCache(
+    settings.snapshot_cache_max_bytes, compress=settings.snapshot_cache_compress
+)
+# Single-flight registry: one shared fetch task per URL.
+_inflight: dict[str, asyncio.Task] = {}
+# Callbacks notified with the URL whenever a feed body is re-downloaded.
+_change_listeners: list[Callable[[str], None]] = []
+stats = FetchStats()
 _client: httpx.AsyncClient | None = None
+# Upstream request slots: global and per mirror host (created lazily).
+_global_slots: asyncio.Semaphore | None = None
+_host_slots: dict[str, asyncio.Semaphore] = {}
+# Identifies this process when holding shared-cache refresh leases.
+_LEASE_OWNER = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
 
 
 async def get_client() -> httpx.AsyncClient:
@@ -30,45 +98,503 @@ async def get_client() -> httpx.AsyncClient:
 
     Creates the client lazily on first call and reuses it afterwards to
     take advantage of connection pooling (keep-alive) and reduce TLS
-    handshakes.
+    handshakes. Pool sizes come from the ``http_*`` settings; HTTP/2
+    multiplexing is used when ``http2_enabled`` is set and the optional
+    ``h2`` package is installed.
 
     Returns:
         httpx.AsyncClient: The shared asynchronous HTTP client.
     """
     global _client  # pylint: disable=global-statement
     if _client is None:
+        http2 = settings.http2_enabled
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("http2_enabled set but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
         _client = httpx.AsyncClient(
             timeout=settings.fetch_timeout_seconds,
             headers={"User-Agent": settings.user_agent},
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            http2=http2,
         )
     return _client
 
 
-async def fetch_feed(url: str) -> dict | None:
+async def close_client() -> None:
+    """Close the shared HTTP client (called on application shutdown).
+
+    Downloads still in flight are cancelled and awaited first: they are
+    shielded from their callers, so stopping the poller does not end them.
+    """
+    global _client, _global_slots  # pylint: disable=global-statement
+    tasks = list(_inflight.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _global_slots = None
+    _host_slots.clear()
+
+
+def _slots(url: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+    """Return the global and per-host semaphores guarding a request."""
+    global _global_slots  # pylint: disable=global-statement
+    if _global_slots is None:
+        _global_slots = asyncio.Semaphore(settings.fetch_concurrency)
+    host = httpx.URL(url).host
+    host_slots = _host_slots.get(host)
+    if host_slots is None:
+        host_slots = _host_slots[host] = asyncio.Semaphore(
+            settings.fetch_per_host_concurrency
+        )
+    return _global_slots, host_slots
+
+
+def parse_feed(content: bytes) -> dict:
+    """Parse a raw feed body into a compact, picklable snapshot.
+
+    Only the fields the timeline uses are kept (see
+    :func:`~nitter_timeline.services.snapshots.compact_feed`), and
+    ``bozo_exception`` is reduced to its message, so the result is small
+    and can cross a process boundary.
+
+    Args:
+        content: Raw response body.
+
+    Returns:
+        dict: Compact parsed feed.
+    """
+    return compact_feed(feedparser.parse(content))
+
+
+def get_snapshot(url: str) -> dict | None:
+    """Return the last successfully parsed feed for ``url`` (maybe stale)."""
+    entry: CachedFeed | None = _validators.get(url)
+    return entry.parsed if entry else None
+
+
+def content_version(url: str, parsed: dict) -> str | None:
+    """Return the body digest ``parsed`` was built from, if still current.
+
+    ``None`` when ``parsed`` is not the snapshot currently held for
+    ``url`` (or it predates content versions).
+    """
+    entry: CachedFeed | None = _validators.get(url)
+    if entry is None or entry.parsed is not parsed:
+        return None
+    return entry.version or None
+
+
+def is_fresh(url: str) -> bool:
+    """Return whether ``url`` has a cache entry still within its TTL."""
+    return url in _cache
+
+
+def needs_refresh(url: str) -> bool:
+    """Return whether ``url`` should be checked upstream now.
+
+    A feed needs a check once it is no longer fresh, unless it is backing
+    off after failed checks (see :meth:`RefreshScheduler.fail`).
+    """
+    return not is_fresh(url) and schedule.is_due(url)
+
+
+async def fetch_feed(url: str, force: bool = False) -> dict | None:
     """Fetch and parse a single RSS/Atom feed.
 
     The raw response body is parsed with *feedparser* and cached in an
-    in-memory TTL cache keyed by URL.
+    in-memory TTL cache keyed by URL. Once the TTL expires the feed is
+    revalidated with a conditional GET; a ``304 Not Modified`` answer
+    refreshes the cached entry without parsing the feed again. Concurrent
+    callers for the same URL await one shared fetch task.
 
     Args:
         url: Absolute feed URL (expected to be a Nitter RSS endpoint).
+        force: Revalidate with the origin even if the TTL entry is fresh.
 
     Returns:
         dict | None: Parsed feed structure, or ``None`` on network / parse
         error (the error is logged, not raised).
     """
-    if url in _cache:
-        return _cache[url]
+    if not force and url in _cache and (entry := _validators.get(url)) is not None:
+        CACHE_REQUESTS.inc("feed", "hit")
+        return entry.parsed
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.create_task(_revalidate(url))
+        _inflight[url] = task
+        task.add_done_callback(lambda t: _release_inflight(url, t))
+        stats.fetches += 1
+        CACHE_REQUESTS.inc("feed", "miss")
+    else:
+        stats.coalesced += 1
+        CACHE_REQUESTS.inc("feed", "coalesced")
+    # Shield so a cancelled caller does not abort the fetch for the others.
+    return await asyncio.shield(task)
+
+
+def _release_inflight(url: str, task: asyncio.Task) -> None:
+    if _inflight.get(url) is task:
+        del _inflight[url]
+
+
+class _RetryableStatusError(Exception):
+    """Upstream answered with a status worth retrying on another mirror."""
+
+
+async def _request(
+    target: str, headers: dict[str, str], started: asyncio.Event | None = None
+) -> httpx.Response:
+    """GET ``target`` and record the outcome in the mirror pool.
+
+    Waits for a global and a per-host request slot first, so fan-out to a
+    single mirror shares a bounded set of connections. ``started`` is set
+    once both slots are held and the request is sent.
+    """
     client = await get_client()
+    global_slots, host_slots = _slots(target)
+    async with global_slots, host_slots:
+        if started is not None:
+            started.set()
+        start = time.perf_counter()
+        try:
+            resp = await client.get(target, headers=headers)
+            if resp.status_code == 429 or resp.status_code >= 500:
+                raise _RetryableStatusError(f"HTTP {resp.status_code}")
+        except asyncio.CancelledError:
+            # Lost a hedge race: the elapsed time is a lower bound on latency.
+            elapsed = time.perf_counter() - start
+            mirror_pool.observe_lower_bound(target, elapsed)
+            _observe_request(target, elapsed, "cancelled")
+            raise
+        except Exception:
+            elapsed = time.perf_counter() - start
+            mirror_pool.record(target, elapsed, ok=False)
+            _observe_request(target, elapsed, "error")
+            raise
+    elapsed = time.perf_counter() - start
+    mirror_pool.record(target, elapsed, ok=True)
+    _observe_request(target, elapsed, str(resp.status_code), len(resp.content))
+    return resp
+
+
+def _observe_request(
+    target: str, elapsed: float, outcome: str, nbytes: int = 0
+) -> None:
+    if not registry.enabled:
+        return
+    mirror = urlsplit(target).netloc
+    FETCH_SECONDS.observe(elapsed, mirror, outcome)
+    if nbytes:
+        FETCH_BYTES.inc(mirror, amount=nbytes)
+
+
+async def _get_with_failover(
+    url: str, headers: dict[str, str]
+) -> httpx.Response:
+    """Fetch ``url`` from the best mirror, failing over and hedging.
+
+    Candidates come from the mirror pool. If the current attempt has not
+    answered within the pool's hedge delay, the next mirror is raced
+    against it; the first usable response wins and the rest are
+    cancelled. Failed attempts fall through to the next candidate. The
+    hedge delay counts from when the attempt holds its request slots, so
+    waiting on local concurrency limits never triggers a hedge.
+
+    Raises:
+        Exception: The last error when every candidate failed.
+    """
+    queue = mirror_pool.candidates(url)[: settings.mirror_max_attempts]
+    pending: dict[asyncio.Task, tuple[str, asyncio.Event]] = {}
+    last_exc: BaseException | None = None
+
+    def launch() -> None:
+        target, started = queue.pop(0), asyncio.Event()
+        pending[asyncio.create_task(_request(target, headers, started))] = (
+            target,
+            started,
+        )
+
+    launch()
     try:
-        resp = await client.get(url)
+        while pending:
+            target, started = list(pending.values())[-1]
+            waiters: set[asyncio.Future] = set(pending)
+            timeout: float | None = None
+            starter: asyncio.Future | None = None
+            if queue and started.is_set():
+                timeout = mirror_pool.hedge_delay(target)
+            elif queue:
+                # Still queued on local slots: arm the hedge once it is sent.
+                starter = asyncio.ensure_future(started.wait())
+                waiters.add(starter)
+            done, _ = await asyncio.wait(
+                waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if starter is not None:
+                starter.cancel()
+                done.discard(starter)
+            if not done:
+                if starter is None:
+                    launch()  # hedge the slow attempt
+                continue
+            for task in done:
+                target, _started = pending.pop(task)
+                if task.exception() is None:
+                    return task.result()
+                last_exc = task.exception()
+                logger.info("mirror attempt failed %s: %s", target, last_exc)
+            if not pending and queue:
+                launch()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_exc or RuntimeError(f"no mirror candidates for {url}")
+
+
+def _body_version(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+async def _revalidate(url: str) -> dict | None:
+    previous: CachedFeed | None = _validators.get(url)
+    shared = get_shared_cache()
+    if shared is None:
+        return await _download(url, previous, None)
+    if (parsed := await _adopt_shared(url, previous, shared)) is not None:
+        return parsed
+    ttl = settings.shared_cache_lease_seconds
+    if not await asyncio.to_thread(shared.acquire, url, _LEASE_OWNER, ttl):
+        # Another worker is refreshing this feed: use its result.
+        if (parsed := await _await_peer(url, previous, shared)) is not None:
+            return parsed
+        if previous is not None:
+            return previous.parsed
+    try:
+        return await _download(url, previous, shared)
+    finally:
+        await asyncio.to_thread(shared.release, url, _LEASE_OWNER)
+
+
+async def _adopt_shared(
+    url: str, previous: CachedFeed | None, shared: SharedCache
+) -> dict | None:
+    """Install a fresh download published by another worker, if any."""
+    meta = await asyncio.to_thread(shared.peek, url)
+    if meta is None:
+        return None
+    if time.time() - meta.fetched_at >= (meta.interval or schedule.interval(url)):
+        return None
+    if meta.interval:
+        # Follow the peer's cadence rather than re-checking on our own.
+        schedule.adopt(url, meta.interval, meta.fetched_at)
+    if previous is not None and previous.version == meta.version:
+        # Peer revalidated content we already parsed.
+        previous.fetched_at = meta.fetched_at
+        _validators[url] = previous
+        _cache[url] = previous.version
+        return previous.parsed
+    full = await asyncio.to_thread(shared.get, url)
+    if full is None or full.body is None:
+        return None
+    with stage("parse"):
+        parsed = await run_cpu(parse_feed, full.body)
+    _install(
+        url,
+        CachedFeed(parsed, full.etag, full.last_modified, full.version, full.fetched_at),
+    )
+    return parsed
+
+
+async def _await_peer(
+    url: str, previous: CachedFeed | None, shared: SharedCache
+) -> dict | None:
+    """Poll the shared cache until the lease holder publishes its result."""
+    deadline = time.monotonic() + settings.shared_cache_lease_seconds
+    since = previous.fetched_at if previous else 0.0
+    delay = 0.05
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+        meta = await asyncio.to_thread(shared.peek, url)
+        if meta is not None and meta.fetched_at > since:
+            return await _adopt_shared(url, previous, shared)
+    return None
+
+
+async def _download(
+    url: str, previous: CachedFeed | None, shared: SharedCache | None
+) -> dict | None:
+    # Validators from one mirror are harmless on another: a mismatching
+    # ETag simply yields a full 200 response.
+    headers = previous.conditional_headers() if previous else {}
+    try:
+        with stage("network"):
+            resp = await _get_with_failover(url, headers)
+        if resp.status_code == 304 and previous is not None:
+            return await _unchanged(url, previous, shared)
         resp.raise_for_status()
     except Exception as exc:  # broad catch for logging
         logger.warning("fetch failed %s: %s", url, exc)
+        schedule.fail(url)
         return None
-    parsed = feedparser.parse(resp.content)
-    _cache[url] = parsed
-    return parsed
+    version = _body_version(resp.content)
+    if previous is not None and previous.version == version:
+        # Identical body without a 304 (origin ignores validators).
+        previous.etag = resp.headers.get("ETag")
+        previous.last_modified = resp.headers.get("Last-Modified")
+        return await _unchanged(url, previous, shared)
+    with stage("parse"):
+        parsed = await run_cpu(parse_feed, resp.content)
+    entry = CachedFeed(
+        parsed=parsed,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+        version=version,
+        fetched_at=time.time(),
+    )
+    schedule.observe(url, changed=True, parsed=parsed)
+    if shared is not None:
+        await asyncio.to_thread(
+            shared.put,
+            url,
+            SharedEntry(
+                entry.version,
+                entry.fetched_at,
+                entry.etag,
+                entry.last_modified,
+                resp.content,
+                schedule.interval(url),
+            ),
+        )
+    if (store := get_store()) is not None:
+        # A full batch is compressed and written here; keep it off the loop.
+        await asyncio.to_thread(
+            store.save_feed, url, entry.etag, entry.last_modified, resp.content
+        )
+    _install(url, entry)
+    return entry.parsed
+
+
+async def _unchanged(
+    url: str, previous: CachedFeed, shared: SharedCache | None
+) -> dict:
+    """Re-arm ``previous`` after an upstream check found no new content."""
+    previous.fetched_at = time.time()
+    interval = schedule.observe(url, changed=False)
+    _validators[url] = previous
+    _cache[url] = previous.version
+    if shared is not None:
+        await asyncio.to_thread(shared.touch, url, previous.fetched_at, interval)
+    return previous.parsed
+
+
+def _install(url: str, entry: CachedFeed) -> None:
+    """Cache a newly parsed feed and notify change listeners."""
+    _validators[url] = entry
+    _cache[url] = entry.version
+    for listener in _change_listeners:
+        listener(url)
+
+
+def _collect() -> list[Counter]:
+    snap = _validators.stats()
+    return [
+        sample(Counter, "nt_fetch_tasks_total", "Upstream fetch tasks started.",
+               {(): stats.fetches}),
+        sample(Counter, "nt_fetch_coalesced_total",
+               "Fetch calls that joined an in-flight fetch.", {(): stats.coalesced}),
+        sample(Gauge, "nt_cache_entries", "Entries held per cache.",
+               {("feed",): len(_cache), ("snapshots",): snap.entries,
+                ("inflight",): len(_inflight)}, ("cache",)),
+        sample(Counter, "nt_snapshot_cache_requests_total",
+               "Snapshot cache lookups by result.",
+               {("hit",): snap.hits, ("miss",): snap.misses}, ("result",)),
+        sample(Counter, "nt_snapshot_cache_evictions_total",
+               "Snapshots evicted to stay within the byte budget.",
+               {(): snap.evictions}),
+        sample(Gauge, "nt_snapshot_cache_bytes", "Approximate bytes held by snapshots.",
+               {(): snap.bytes}),
+    ]
+
+
+registry.add_collector(_collect)
+
+
+def add_change_listener(listener: Callable[[str], None]) -> None:
+    """Register ``listener(url)`` to run after a feed is re-downloaded.
+
+    Listeners run on the event loop and must not block; a ``304`` answer
+    does not trigger them.
+    """
+    _change_listeners.append(listener)
+
+
+async def warm_start() -> int:
+    """Hydrate the snapshot cache from the persistent store.
+
+    Restored feeds are served as stale snapshots and revalidated with
+    their stored validators on first use.
+
+    Returns:
+        int: Number of feeds restored (``0`` when persistence is off).
+    """
+    store = get_store()
+    if store is None:
+        return 0
+    stored = await asyncio.to_thread(lambda: list(store.load_feeds()))
+    for feed in stored:
+        _validators[feed.url] = CachedFeed(
+            parsed=await run_cpu(parse_feed, feed.body),
+            etag=feed.etag,
+            last_modified=feed.last_modified,
+            version=_body_version(feed.body),
+        )
+    logger.info("restored %d feeds from %s", len(stored), store.path)
+    return len(stored)
+
+
+async def gather_feeds(urls: Iterable[str]) -> list[tuple[str, dict]]:
+    """Fetch already validated feed URLs concurrently.
+
+    Args:
+        urls: Feed URLs that passed
+            :func:`~nitter_timeline.services.validation.filter_feed_urls`.
+
+    Returns:
+        list[tuple[str, dict]]: ``(url, parsed_feed)`` tuples for the feeds
+        that were retrieved, in completion order.
+    """
+    results: list[tuple[str, dict]] = []
+
+    async def one(feed_url: str) -> None:
+        parsed = await fetch_feed(feed_url)
+        if parsed:
+            results.append((feed_url, parsed))
+
+    await asyncio.gather(*(one(u) for u in urls))
+    return results
+
+
+async def iter_feeds(urls: Iterable[str]) -> AsyncIterator[tuple[str, dict]]:
+    """Yield ``(url, parsed_feed)`` for validated URLs as each completes.
+
+    Failed feeds are skipped (the error is logged by :func:`fetch_feed`).
+    """
+
+    async def one(feed_url: str) -> tuple[str, dict | None]:
+        return feed_url, await fetch_feed(feed_url)
+
+    for next_done in asyncio.as_completed([one(u) for u in urls]):
+        url, parsed = await next_done
+        if parsed:
+            yield url, parsed
 
 
 async def fetch_many(urls: Iterable[str]) -> list[tuple[str, dict]]:
@@ -87,40 +613,4 @@ async def fetch_many(urls: Iterable[str]) -> list[tuple[str, dict]]:
           inside individual fetches are already handled in ``fetch_feed``.
         * Output order corresponds to completion order, not input order.
     """
-    results: list[tuple[str, dict]] = []
-
-    def _valid(url: str) -> bool:
-        try:
-            parsed = urlparse(url)
-            if parsed.scheme not in settings.allowed_feed_schemes:
-                return False
-            if settings.enforce_https_feeds and parsed.scheme != "https":
-                return False
-            host = parsed.hostname or ""
-            if not any(
-                host.endswith(suf)
-                for suf in settings.allowed_feed_domain_suffixes
-            ):
-                return False
-            # Resolve and ensure not private
-            for info in socket.getaddrinfo(host, None):
-                ip = ipaddress.ip_address(info[4][0])
-                if ip.is_private or ip.is_loopback or ip.is_link_local:
-                    return False
-            return True
-        except Exception:  # validation failure -> False
-            return False
-
-    async def one(feed_url: str) -> None:
-        parsed = await fetch_feed(feed_url)
-        if parsed:
-            results.append((feed_url, parsed))
-
-    filtered = []
-    for u in urls:
-        if _valid(u):
-            filtered.append(u)
-            if len(filtered) >= settings.max_feeds_per_request:
-                break
-    await asyncio.gather(*(one(u) for u in filtered))
-    return results
+    return await gather_feeds(await filter_feed_urls(urls))
@@ -0,0 +1,147 @@
+"""Timeline filter rules (muted keywords / authors, replies, retweets).
+
+A :class:`FilterRules` set is compiled once into a :class:`CompiledFilter`:
+all muted keywords become a single case-insensitive alternation regex and
+muted authors a hash set, so checking an item is one regex search plus a
+set lookup however long the mute lists are. Compiled filters are cached
+by the rule set's digest, and each feed's filtered item list is cached
+while the feed is unchanged, so repeated requests reuse both.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from cachetools import LRUCache
+
+from nitter_timeline.models.feed import FeedRecord
+from nitter_timeline.services.sanitize import html_to_text
+
+# Item kinds that can be hidden wholesale (see ``FeedRecord.kind``).
+HIDEABLE_KINDS = ("reply", "retweet")
+_KIND_ALIASES = {"replies": "reply", "retweets": "retweet"}
+
+_compiled: LRUCache = LRUCache(maxsize=64)
+# (feed url, rules digest) -> (source item list, filtered list)
+_filtered: LRUCache = LRUCache(maxsize=1024)
+_lock = threading.Lock()
+
+
+def _author_key(author: str) -> str:
+    return author.strip().lstrip("@").lower()
+
+
+@dataclass(slots=True, frozen=True)
+class FilterRules:
+    """Normalized rule set; build with :meth:`from_params`.
+
+    Attributes:
+        keywords: Muted words/phrases (lower-cased, sorted, unique).
+        authors: Muted author handles (without ``@``, lower-cased).
+        hide: Item kinds to drop (subset of :data:`HIDEABLE_KINDS`).
+    """
+
+    keywords: tuple[str, ...] = ()
+    authors: tuple[str, ...] = ()
+    hide: tuple[str, ...] = ()
+
+    @classmethod
+    def from_params(
+        cls,
+        keywords: Iterable[str] = (),
+        authors: Iterable[str] = (),
+        hide: Iterable[str] = (),
+    ) -> FilterRules:
+        """Normalize raw rule values (order and case do not matter).
+
+        Raises:
+            ValueError: If ``hide`` names an unknown item kind.
+        """
+        kinds = {
+            _KIND_ALIASES.get(h, h) for h in (h.strip().lower() for h in hide) if h
+        }
+        if unknown := kinds.difference(HIDEABLE_KINDS):
+            raise ValueError(f"unknown item kinds: {', '.join(sorted(unknown))}")
+        return cls(
+            keywords=tuple(sorted({k.strip().lower() for k in keywords if k.strip()})),
+            authors=tuple(sorted({_author_key(a) for a in authors if a.strip()})),
+            hide=tuple(sorted(kinds)),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.keywords or self.authors or self.hide)
+
+    @property
+    def digest(self) -> str:
+        """Stable hash of the rule set (cache key)."""
+        raw = "\0".join(("\x1f".join(self.keywords), "\x1f".join(self.authors), *self.hide))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class CompiledFilter:
+    """Executable form of a :class:`FilterRules` set.
+
+    Attributes:
+        digest: Digest of the rules it was compiled from.
+    """
+
+    __slots__ = ("_authors", "_hide", "_pattern", "digest")
+
+    def __init__(self, rules: FilterRules) -> None:
+        self.digest = rules.digest
+        self._authors = frozenset(rules.authors)
+        self._hide = frozenset(rules.hide)
+        self._pattern: re.Pattern[str] | None = None
+        if rules.keywords:
+            # Longest first so overlapping phrases match as a whole;
+            # look-arounds instead of \b also work for "#tag" / "@user".
+            alternation = "|".join(
+                re.escape(k) for k in sorted(rules.keywords, key=len, reverse=True)
+            )
+            self._pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+
+    def drops(self, item: FeedRecord) -> bool:
+        """Return whether ``item`` is filtered out."""
+        if item.kind in self._hide:
+            return True
+        if self._authors and _author_key(item.author) in self._authors:
+            return True
+        if self._pattern is not None:
+            # Plain text only: markup and URLs (image/link hosts) never match.
+            if item.text is None:
+                item.text = html_to_text(item.content_html)
+            return self._pattern.search(item.text) is not None
+        return False
+
+    def apply(self, url: str, items: list[FeedRecord]) -> list[FeedRecord]:
+        """Return ``items`` without filtered ones, cached per feed list.
+
+        The same filtered list object is returned while ``items`` is
+        unchanged, so downstream identity-keyed caches stay valid.
+        """
+        key = (url, self.digest)
+        with _lock:
+            cached = _filtered.get(key)
+        if cached is not None and cached[0] is items:
+            return cached[1]
+        kept = [item for item in items if not self.drops(item)]
+        with _lock:
+            _filtered[key] = (items, kept)
+        return kept
+
+
+def compile_rules(rules: FilterRules) -> CompiledFilter | None:
+    """Return the cached compiled filter for ``rules`` (``None`` if empty)."""
+    if not rules:
+        return None
+    digest = rules.digest
+    with _lock:
+        compiled = _compiled.get(digest)
+    if compiled is None:
+        compiled = CompiledFilter(rules)
+        with _lock:
+            _compiled[digest] = compiled
+    return compiled
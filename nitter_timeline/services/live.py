@@ -0,0 +1,208 @@
+"""Server-side fan-out of new timeline items to live subscribers.
+
+Clients watching the same feed set with the same filter rules share one
+:class:`LiveChannel`. When
+the fetcher re-downloads one of the channel's feeds, the channel merges
+the feed set once, keeps only items newer than what it already announced
+and serializes them once; every subscriber receives the same pre-encoded
+Server-Sent Events frame. N clients therefore cost one upstream refresh
+(done by the background poller, which keeps the feeds of open channels
+refreshed) and one diff, not N aggregations.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+
+from nitter_timeline.core.metrics import Counter, Gauge, registry, sample
+from nitter_timeline.models.feed import FeedRecord
+from nitter_timeline.services import fetcher
+from nitter_timeline.services.aggregator import load_feed_items, merge_top
+from nitter_timeline.services.filters import CompiledFilter, FilterRules, compile_rules
+from nitter_timeline.services.poller import poller
+from nitter_timeline.services.serialize import items_json
+from nitter_timeline.services.timeline_index import SortKey, encode_cursor, item_key
+
+logger = logging.getLogger(__name__)
+
+# Most items announced in a single push.
+MAX_PUSH_ITEMS = 500
+# Frames buffered per subscriber before the oldest is dropped.
+_QUEUE_SIZE = 16
+
+
+def sse_frame(items: list[FeedRecord]) -> bytes:
+    """Encode items (newest first) as one ``items`` SSE event.
+
+    The event ``id`` is a cursor for the newest item, so a reconnecting
+    ``EventSource`` resumes from it through ``Last-Event-ID``.
+    """
+    cursor = encode_cursor("prev", item_key(items[0]))
+    return (
+        f"id: {cursor}\nevent: items\ndata: ".encode()
+        + b'{"items":' + items_json(r.to_item() for r in items) + b"}\n\n"
+    )
+
+
+async def merged_snapshot(
+    feeds: tuple[str, ...], limit: int, rules: CompiledFilter | None = None
+) -> list[FeedRecord]:
+    """Merge the current snapshots of ``feeds`` (newest first).
+
+    Items dropped by ``rules`` are left out (filtered lists are cached per
+    feed, see :meth:`CompiledFilter.apply`).
+    """
+    streams = []
+    for url in feeds:
+        parsed = fetcher.get_snapshot(url)
+        if parsed is not None:
+            items = await load_feed_items(url, parsed)
+            streams.append(rules.apply(url, items) if rules is not None else items)
+    return merge_top(streams, limit)
+
+
+def newer_than(items: list[FeedRecord], key: SortKey | None) -> list[FeedRecord]:
+    """Return the prefix of ``items`` that sorts before (is newer than) ``key``."""
+    if key is None:
+        return items
+    out: list[FeedRecord] = []
+    for item in items:
+        if item_key(item) >= key:
+            break
+        out.append(item)
+    return out
+
+
+class LiveChannel:
+    """Subscribers of one filtered feed set plus the newest key announced."""
+
+    def __init__(
+        self, feeds: tuple[str, ...], rules: CompiledFilter | None = None
+    ) -> None:
+        self.feeds = feeds
+        self.rules = rules
+        self.subscribers: set[asyncio.Queue[bytes]] = set()
+        self.top: SortKey | None = None
+        self._dirty = False
+        self._task: asyncio.Task | None = None
+
+    async def prime(self) -> None:
+        """Initialize ``top`` from the current snapshots."""
+        if self.top is None:
+            items = await merged_snapshot(self.feeds, 1, self.rules)
+            self.top = item_key(items[0]) if items else None
+
+    def mark_dirty(self) -> None:
+        """Schedule a diff; repeated changes collapse into one run."""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._diff_loop())
+
+    async def _diff_loop(self) -> None:
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self._diff()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("live diff failed for %s", self.feeds)
+
+    async def _diff(self) -> None:
+        new = newer_than(
+            await merged_snapshot(self.feeds, MAX_PUSH_ITEMS, self.rules), self.top
+        )
+        if not new:
+            return
+        self.top = item_key(new[0])
+        self.broadcast(sse_frame(new))
+
+    def broadcast(self, frame: bytes) -> None:
+        """Queue ``frame`` for every subscriber (dropping stale backlog)."""
+        for queue in self.subscribers:
+            if queue.full():
+                with contextlib.suppress(asyncio.QueueEmpty):
+                    queue.get_nowait()
+            queue.put_nowait(frame)
+
+    def close(self) -> None:
+        """Cancel a pending diff."""
+        if self._task is not None:
+            self._task.cancel()
+
+
+class LiveHub:
+    """Registry of live channels keyed by normalized feed set and rules."""
+
+    def __init__(self) -> None:
+        self._channels: dict[tuple[tuple[str, ...], str], LiveChannel] = {}
+        self._listening = False
+
+    def feeds(self) -> set[str]:
+        """Return the feeds of every open channel."""
+        return {url for channel in list(self._channels.values()) for url in channel.feeds}
+
+    def _on_feed_changed(self, url: str) -> None:
+        for channel in list(self._channels.values()):
+            if url in channel.feeds:
+                channel.mark_dirty()
+
+    @contextlib.asynccontextmanager
+    async def subscribe(
+        self, feeds: list[str], rules: FilterRules | None = None
+    ) -> AsyncIterator[tuple[LiveChannel, asyncio.Queue[bytes]]]:
+        """Join (creating if needed) the channel for ``feeds`` and ``rules``.
+
+        Args:
+            feeds: Validated feed URLs.
+            rules: Optional filter rules; equivalent rule sets share a
+                channel (keyed by the rules digest).
+
+        Yields:
+            tuple[LiveChannel, asyncio.Queue[bytes]]: The shared channel and
+            this subscriber's queue of encoded SSE frames.
+        """
+        if not self._listening:
+            fetcher.add_change_listener(self._on_feed_changed)
+            # Open channels keep their feeds refreshed however quiet they are.
+            poller.add_source(self.feeds)
+            self._listening = True
+        compiled = compile_rules(rules) if rules is not None else None
+        feed_set = tuple(sorted(set(feeds)))
+        key = (feed_set, compiled.digest if compiled else "")
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = LiveChannel(feed_set, compiled)
+        await channel.prime()
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        channel.subscribers.add(queue)
+        try:
+            yield channel, queue
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.subscribers and self._channels.get(key) is channel:
+                channel.close()
+                del self._channels[key]
+
+    def stats(self) -> dict[str, int]:
+        """Return channel and subscriber counts."""
+        return {
+            "channels": len(self._channels),
+            "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+        }
+
+
+hub = LiveHub()
+
+
+def _collect() -> list[Counter]:
+    stats = hub.stats()
+    return [
+        sample(Gauge, "nt_live_channels", "Open live timeline channels.",
+               {(): stats["channels"]}),
+        sample(Gauge, "nt_live_subscribers", "Connected live subscribers.",
+               {(): stats["subscribers"]}),
+    ]
+
+
+registry.add_collector(_collect)
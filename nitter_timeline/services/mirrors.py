@@ -0,0 +1,196 @@
+"""Health-scored selection across the configured Nitter mirrors.
+
+Feeds hosted on one of ``nitter_base_urls`` can be served by any of them:
+the feed path is rewritten onto each mirror and the mirrors are ranked by
+an exponentially weighted moving average (EWMA) of latency and error
+rate. Mirrors that fail repeatedly are taken out of rotation by a circuit
+breaker for a cooldown period, then probed again (half-open).
+
+Mirror origins are held to the same rules as feed URLs: origins outside
+``allowed_feed_domain_suffixes`` (or with a disallowed scheme) are
+ignored, and :meth:`MirrorPool.validate` drops origins resolving to
+private, loopback or link-local addresses at startup.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from urllib.parse import urlsplit
+
+from nitter_timeline.core.config import settings
+from nitter_timeline.core.metrics import Counter, Gauge, registry, sample
+from nitter_timeline.services.validation import allowed_host, is_allowed_feed_url
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the EWMAs.
+_ALPHA = 0.2
+# How strongly the error rate penalizes a mirror's latency score.
+_ERROR_PENALTY = 10.0
+
+
+@dataclass(slots=True)
+class MirrorHealth:
+    """Rolling health of a single mirror.
+
+    Attributes:
+        latency: EWMA of request latency in seconds.
+        error_rate: EWMA of the failure indicator (0..1).
+        consecutive_failures: Failures since the last success.
+        open_until: Monotonic deadline while the circuit breaker is open.
+        requests: Total requests recorded.
+        failures: Total failures recorded.
+    """
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+    @property
+    def score(self) -> float:
+        """Lower is better; untried mirrors score 0 and get probed first."""
+        return self.latency * (1.0 + _ERROR_PENALTY * self.error_rate)
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(str(url))
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class MirrorPool:
+    """Ranks mirrors and tracks their health.
+
+    Args:
+        base_urls: Mirror base URLs (``scheme://host``).
+        failure_threshold: Consecutive failures that open the breaker.
+        cooldown: Seconds the breaker stays open.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+    ) -> None:
+        self.origins: list[str] = []
+        for origin in dict.fromkeys(_origin(u) for u in base_urls):
+            if allowed_host(origin + "/") is None:
+                logger.warning("ignoring mirror %s: scheme or domain not allowed", origin)
+            else:
+                self.origins.append(origin)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._health: dict[str, MirrorHealth] = {
+            o: MirrorHealth() for o in self.origins
+        }
+
+    async def validate(self) -> None:
+        """Drop mirrors whose host resolves to a non-public address."""
+        verdicts = await asyncio.gather(
+            *(is_allowed_feed_url(origin + "/") for origin in self.origins)
+        )
+        for origin, ok in zip(list(self.origins), verdicts, strict=True):
+            if not ok:
+                logger.warning("ignoring mirror %s: failed address checks", origin)
+                self.origins.remove(origin)
+                self._health.pop(origin, None)
+
+    def health(self, origin: str) -> MirrorHealth:
+        """Return (creating if needed) the health record of ``origin``."""
+        return self._health.setdefault(origin, MirrorHealth())
+
+    def candidates(self, url: str) -> list[str]:
+        """Return absolute URLs to try for ``url``, best mirror first.
+
+        Feeds not hosted on a configured mirror are returned unchanged.
+        Mirrors with an open breaker are skipped unless every mirror is
+        open, in which case all are returned by score.
+        """
+        origin = _origin(url)
+        if origin not in self.origins:
+            return [url]
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        now = time.monotonic()
+        ranked = sorted(self.origins, key=lambda o: self._health[o].score)
+        usable = [o for o in ranked if self._health[o].open_until <= now]
+        return [o + path for o in (usable or ranked)]
+
+    def observe_latency(self, url: str, latency: float) -> None:
+        """Fold a latency sample into the mirror's EWMA."""
+        h = self.health(_origin(url))
+        h.latency = latency if h.latency == 0.0 else (
+            (1 - _ALPHA) * h.latency + _ALPHA * latency
+        )
+
+    def observe_lower_bound(self, url: str, elapsed: float) -> None:
+        """Note that a request to the mirror took at least ``elapsed``.
+
+        Used for attempts cancelled before answering (lost hedge races).
+        Such a sample can only raise the latency estimate, so a mirror
+        that never answered cannot rank ahead of one that did.
+        """
+        h = self.health(_origin(url))
+        h.latency = max(h.latency, elapsed)
+
+    def record(self, url: str, latency: float, ok: bool) -> None:
+        """Fold one request outcome into the mirror's health."""
+        self.observe_latency(url, latency)
+        h = self.health(_origin(url))
+        h.requests += 1
+        h.error_rate = (1 - _ALPHA) * h.error_rate + _ALPHA * (0.0 if ok else 1.0)
+        if ok:
+            h.consecutive_failures = 0
+            h.open_until = 0.0
+            return
+        h.failures += 1
+        h.consecutive_failures += 1
+        if h.consecutive_failures >= self.failure_threshold:
+            h.open_until = time.monotonic() + self.cooldown
+
+    def hedge_delay(self, url: str) -> float | None:
+        """Seconds to wait on ``url`` before hedging to the next mirror.
+
+        Returns ``None`` when hedging is disabled. The delay is at least
+        ``mirror_hedge_delay_seconds`` and grows with the mirror's usual
+        latency so only unusually slow requests are hedged.
+        """
+        if settings.mirror_hedge_delay_seconds is None:
+            return None
+        usual = self.health(_origin(url)).latency
+        return max(settings.mirror_hedge_delay_seconds, 2 * usual)
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return per-mirror health as plain dicts (for diagnostics)."""
+        return {o: asdict(h) for o, h in self._health.items()}
+
+
+pool = MirrorPool(
+    [str(u) for u in settings.nitter_base_urls],
+    failure_threshold=settings.mirror_failure_threshold,
+    cooldown=settings.mirror_cooldown_seconds,
+)
+
+
+def _collect() -> list[Counter]:
+    health = {(o,): h for o, h in pool._health.items()}  # pylint: disable=protected-access
+    now = time.monotonic()
+    labels = ("mirror",)
+    return [
+        sample(Counter, "nt_mirror_requests_total", "Requests recorded per mirror.",
+               {k: h.requests for k, h in health.items()}, labels),
+        sample(Counter, "nt_mirror_failures_total", "Failures recorded per mirror.",
+               {k: h.failures for k, h in health.items()}, labels),
+        sample(Gauge, "nt_mirror_score", "Mirror health score (lower is better).",
+               {k: h.score for k, h in health.items()}, labels),
+        sample(Gauge, "nt_mirror_circuit_open", "1 while the circuit breaker is open.",
+               {k: float(h.open_until > now) for k, h in health.items()}, labels),
+    ]
+
+
+registry.add_collector(_collect)
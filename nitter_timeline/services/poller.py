@@ -0,0 +1,168 @@
+"""Background feed refresh with stale-while-revalidate serving.
+
+The poller keeps ``default_feeds`` and recently requested feeds warm by
+revalidating each of them when its adaptive refresh interval (see
+:mod:`.schedule`) runs out. Timeline requests are answered from the last
+good snapshot; only feeds never seen before are fetched inline.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Callable, Iterable
+
+from cachetools import TTLCache
+
+from nitter_timeline.core.config import settings
+from nitter_timeline.services import fetcher
+from nitter_timeline.services.schedule import schedule
+from nitter_timeline.services.store import get_store
+from nitter_timeline.services.validation import filter_feed_urls
+
+logger = logging.getLogger(__name__)
+
+
+class FeedPoller:
+    """Scheduler refreshing tracked feeds in the background.
+
+    Each round revalidates the tracked feeds that are due, then sleeps
+    until the next one is due.
+
+    Attributes:
+        interval: Longest sleep between refresh rounds.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        recent_ttl: float,
+        max_tracked: int,
+    ) -> None:
+        self.interval = interval
+        self._recent: TTLCache = TTLCache(maxsize=max_tracked, ttl=recent_ttl)
+        self._task: asyncio.Task | None = None
+        self._pending: dict[str, asyncio.Task] = {}
+        self._sources: list[Callable[[], Iterable[str]]] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the refresh loop is active."""
+        return self._task is not None and not self._task.done()
+
+    def track(self, urls: Iterable[str]) -> None:
+        """Mark ``urls`` as recently requested (extends their lifetime)."""
+        for url in urls:
+            self._recent[url] = True
+
+    def add_source(self, source: Callable[[], Iterable[str]]) -> None:
+        """Register ``source`` as a provider of feeds to keep refreshed.
+
+        Its feeds are tracked for as long as it returns them (e.g. the
+        feeds of open live channels), regardless of ``recent_ttl``.
+        """
+        self._sources.append(source)
+
+    async def tracked(self) -> list[str]:
+        """Return the feeds refreshed on every round (defaults first)."""
+        defaults = await filter_feed_urls(settings.default_feeds)
+        extra = list(self._recent.keys())
+        for source in self._sources:
+            extra.extend(source())
+        return list(dict.fromkeys([*defaults, *extra]))
+
+    async def refresh(self, urls: Iterable[str]) -> None:
+        """Revalidate ``urls`` with the origin, ignoring the TTL cache."""
+        await asyncio.gather(*(fetcher.fetch_feed(u, force=True) for u in urls))
+
+    def schedule_refresh(self, url: str) -> None:
+        """Refresh ``url`` in the background unless already in progress."""
+        if url in self._pending:
+            return
+        task = asyncio.create_task(fetcher.fetch_feed(url, force=True))
+        self._pending[url] = task
+        task.add_done_callback(lambda _t: self._pending.pop(url, None))
+
+    async def get_many(self, urls: Iterable[str]) -> list[tuple[str, dict]]:
+        """Return parsed feeds for ``urls`` without waiting on the network.
+
+        Stale snapshots are returned immediately and refreshed in the
+        background. Feeds with no snapshot yet are fetched inline once.
+
+        Args:
+            urls: Feed URLs requested by the client.
+
+        Returns:
+            list[tuple[str, dict]]: ``(url, parsed_feed)`` tuples.
+        """
+        results, missing = await self._snapshots(urls)
+        if missing:
+            results.extend(await fetcher.gather_feeds(missing))
+        return results
+
+    async def iter_many(self, urls: Iterable[str]) -> AsyncIterator[tuple[str, dict]]:
+        """Like :meth:`get_many` but yield feeds as they become available.
+
+        Snapshots are yielded first; feeds without one follow as their
+        inline fetches complete.
+        """
+        results, missing = await self._snapshots(urls)
+        for pair in results:
+            yield pair
+        async for pair in fetcher.iter_feeds(missing):
+            yield pair
+
+    async def _snapshots(
+        self, urls: Iterable[str]
+    ) -> tuple[list[tuple[str, dict]], list[str]]:
+        """Split validated ``urls`` into available snapshots and misses."""
+        filtered = await filter_feed_urls(urls)
+        self.track(filtered)
+        results: list[tuple[str, dict]] = []
+        missing: list[str] = []
+        for url in filtered:
+            snapshot = fetcher.get_snapshot(url)
+            if snapshot is None:
+                missing.append(url)
+                continue
+            results.append((url, snapshot))
+            if fetcher.needs_refresh(url):
+                self.schedule_refresh(url)
+        return results, missing
+
+    async def _run(self) -> None:
+        while True:
+            delay = self.interval
+            try:
+                tracked = await self.tracked()
+                await self.refresh([u for u in tracked if fetcher.needs_refresh(u)])
+                if (store := get_store()) is not None:
+                    await asyncio.to_thread(store.flush)
+                if (until_due := schedule.seconds_until_due(tracked)) is not None:
+                    delay = min(delay, max(until_due, 1.0))
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("background refresh round failed")
+            await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        """Start the refresh loop on the running event loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresh loop and any pending background refresh."""
+        tasks = [t for t in (self._task, *self._pending.values()) if t]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._task = None
+        self._pending.clear()
+
+
+poller = FeedPoller(
+    interval=settings.poll_interval_seconds,
+    recent_ttl=settings.poll_recent_feed_ttl_seconds,
+    max_tracked=settings.poll_max_tracked_feeds,
+)
@@ -0,0 +1,120 @@
+"""Memoized ``/api/timeline`` responses.
+
+A serialized timeline depends only on the request (feed set, ``limit``,
+cursor, selected fields) and on the content of the feeds it was built
+from. Responses are cached under the normalized request and stored with
+the per-feed content versions they were built from; a lookup with
+different versions is a miss. Each body gets a strong ETag so clients
+revalidating an unchanged timeline receive ``304`` without any
+aggregation or serialization work.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Hashable, Iterable, Sequence
+from dataclasses import dataclass
+
+from cachetools import LRUCache
+
+from nitter_timeline.core.config import settings
+from nitter_timeline.core.metrics import CACHE_REQUESTS
+from nitter_timeline.services.fetcher import content_version
+
+# (url, content version) per feed, in URL order.
+Versions = tuple[tuple[str, str], ...]
+
+
+@dataclass(slots=True, frozen=True)
+class CachedResponse:
+    """Serialized timeline plus what it was built from.
+
+    Attributes:
+        versions: Content versions of the feeds the body was built from.
+        body: JSON response body.
+        etag: Strong entity tag of ``body`` (quoted).
+    """
+
+    versions: Versions
+    body: bytes
+    etag: str
+
+
+def request_key(
+    feeds: Iterable[str], limit: int, cursor: str | None, *extra: Hashable
+) -> tuple:
+    """Normalize a timeline request into a cache key.
+
+    The feed list is sorted and de-duplicated, so requests for the same
+    set in any order share an entry.
+    """
+    return (tuple(sorted(set(feeds))), limit, cursor, *extra)
+
+
+def make_etag(body: bytes) -> str:
+    """Return a strong ETag for ``body``."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison is what If-None-Match specifies.
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    """LRU of serialized timelines validated by feed content versions.
+
+    Args:
+        maxsize: Maximum number of cached responses.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, versions: Versions) -> CachedResponse | None:
+        """Return the response for ``key`` if built from ``versions``."""
+        with self._lock:
+            entry: CachedResponse | None = self._entries.get(key)
+        if entry is None or entry.versions != versions:
+            CACHE_REQUESTS.inc("timeline", "miss")
+            return None
+        CACHE_REQUESTS.inc("timeline", "hit")
+        return entry
+
+    def put(self, key: tuple, versions: Versions, body: bytes) -> CachedResponse:
+        """Store ``body`` for ``key`` and return the cached response."""
+        entry = CachedResponse(versions, body, make_etag(body))
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+
+def versions_of(fetched: Sequence[tuple[str, dict]]) -> Versions | None:
+    """Collect the content version of each fetched feed.
+
+    Returns:
+        Versions | None: Sorted versions, or ``None`` if any feed has no
+        known version (the response must not be cached then).
+    """
+    out = []
+    for url, parsed in fetched:
+        if not (v := content_version(url, parsed)):
+            return None
+        out.append((url, v))
+    return tuple(sorted(out))
+
+
+timeline_cache = ResponseCache(maxsize=settings.response_cache_size)
@@ -1,7 +1,15 @@
 """HTML sanitization helpers."""
 from __future__ import annotations
 
+import functools
+import hashlib
+import html
+import threading
+from collections.abc import Iterable, Iterator
+
 import bleach
+from bleach.html5lib_shim import Filter
+from cachetools import LRUCache
 
 ALLOWED_TAGS: list[str] = [
     "a",
@@ -27,37 +35,104 @@ ALLOWED_ATTRIBUTES: dict[str, list[str]] = {
 ALLOWED_PROTOCOLS = ["http", "https"]
 
 
-def _post_process_images(html: str) -> str:
-    """Inject safe default attributes for ``<img>`` tags.
+# Attributes injected into every kept ``<img>`` unless already present.
+IMG_DEFAULT_ATTRIBUTES: dict[str, str] = {
+    "loading": "lazy",
+    "decoding": "async",
+    "referrerpolicy": "no-referrer",
+    "class": "tl-img",
+}
+
+
+class ImageFilter(Filter):
+    """Token filter capping ``<img>`` count and adding safe defaults.
+
+    Runs inside bleach's serialization pass, after tag/attribute
+    filtering, so no second parse or regex pass over the HTML is needed.
+    """
+
+    def __init__(self, source: Iterable[dict], max_images: int | None = None) -> None:
+        super().__init__(source)
+        self.max_images = max_images
+
+    def __iter__(self) -> Iterator[dict]:
+        kept = 0
+        for token in super().__iter__():
+            if token["type"] in ("StartTag", "EmptyTag") and token["name"] == "img":
+                if self.max_images is not None and kept >= self.max_images:
+                    continue
+                kept += 1
+                attrs = token["data"]
+                for name, value in IMG_DEFAULT_ATTRIBUTES.items():
+                    attrs.setdefault((None, name), value)
+            yield token
+
+
+# Cleaner instances keep parser state and are not thread-safe.
+_local = threading.local()
+# content digest -> sanitized HTML (retweets / mirrors repeat content)
+_memo: LRUCache = LRUCache(maxsize=4096)
+_memo_lock = threading.Lock()
+
+
+def _cleaner(max_images: int | None) -> bleach.sanitizer.Cleaner:
+    cleaners = getattr(_local, "cleaners", None)
+    if cleaners is None:
+        cleaners = _local.cleaners = {}
+    cleaner = cleaners.get(max_images)
+    if cleaner is None:
+        cleaner = cleaners[max_images] = bleach.sanitizer.Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            protocols=ALLOWED_PROTOCOLS,
+            strip=True,
+            filters=[functools.partial(ImageFilter, max_images=max_images)],
+        )
+    return cleaner
+
+
+def sanitize_html(raw: str, max_images: int | None = None) -> str:
+    """Return sanitized HTML (with limited tags) and enhanced images.
+
+    Tag filtering, the image cap and default image attributes happen in a
+    single tokenizer pass. Results are memoized by content digest.
+
+    Args:
+        raw: Untrusted HTML from the feed.
+        max_images: Keep at most this many ``<img>`` tags (``None`` keeps
+            all).
+
+    Returns:
+        str: Sanitized HTML.
+    """
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+    key = (digest, max_images)
+    with _memo_lock:
+        cached = _memo.get(key)
+    if cached is not None:
+        return cached
+    cleaned = _cleaner(max_images).clean(raw)
+    with _memo_lock:
+        _memo[key] = cleaned
+    return cleaned
+
+
+def html_to_text(raw: str) -> str:
+    """Return the text content of ``raw`` (tags dropped, entities decoded).
 
-    Adds lazy loading & async decoding if not present and a referrer policy.
-    Avoids heavy HTML parsers by using a small regex on sanitized HTML.
+    Used for matching rules against what a reader sees, not against
+    attribute values such as image or link URLs. Memoized by content
+    digest like :func:`sanitize_html`.
     """
-    import re  # local import to avoid cost if unused
-
-    def repl(match: re.Match) -> str:  # type: ignore[name-defined]
-        tag = match.group(0)
-        # Ensure loading attribute
-        if "loading=" not in tag:
-            tag = tag[:-1] + ' loading="lazy">'
-        if "decoding=" not in tag:
-            tag = tag[:-1] + ' decoding="async">'
-        if "referrerpolicy=" not in tag:
-            tag = tag[:-1] + ' referrerpolicy="no-referrer">'
-        if "class=" not in tag:
-            tag = tag[:-1] + ' class="tl-img">'
-        return tag
-
-    return re.sub(r"<img\b[^>]*?>", repl, html, flags=re.IGNORECASE)
-
-
-def sanitize_html(raw: str) -> str:
-    """Return sanitized HTML (with limited tags) and enhanced images."""
-    cleaned = bleach.clean(
-        raw,
-        tags=ALLOWED_TAGS,
-        attributes=ALLOWED_ATTRIBUTES,
-        protocols=ALLOWED_PROTOCOLS,
-        strip=True,
-    )
-    return _post_process_images(cleaned)
+    key = (hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest(), "text")
+    with _memo_lock:
+        cached = _memo.get(key)
+    if cached is not None:
+        return cached
+    cleaner = getattr(_local, "text_cleaner", None)
+    if cleaner is None:
+        cleaner = _local.text_cleaner = bleach.sanitizer.Cleaner(tags=[], strip=True)
+    text = html.unescape(cleaner.clean(raw))
+    with _memo_lock:
+        _memo[key] = text
+    return text
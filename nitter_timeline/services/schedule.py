@@ -0,0 +1,237 @@
+"""Adaptive per-feed refresh intervals.
+
+Every upstream check of a feed is reported to the :class:`RefreshScheduler`
+together with whether the content changed. It keeps an EWMA of the feed's
+inter-post interval (from entry timestamps) and of its "not modified"
+rate, and derives the feed's refresh interval from them: busy feeds are
+refreshed about twice per expected post, feeds that keep answering
+``304`` back off. Intervals are clamped to
+``refresh_min_interval_seconds`` .. ``refresh_max_interval_seconds`` and
+jittered so feeds added together do not refresh in lock-step. Failed
+checks back off exponentially within the same bounds.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+
+from cachetools import LRUCache
+
+from nitter_timeline.core.config import settings
+from nitter_timeline.core.metrics import Counter, Gauge, registry, sample
+from nitter_timeline.services.dates import entry_published
+
+# Weight of the newest sample in the EWMAs.
+_ALPHA = 0.3
+# Entries considered when estimating the posting interval.
+_SAMPLE_ENTRIES = 20
+# Refresh this many times per expected post.
+_CHECKS_PER_POST = 2.0
+
+
+@dataclass(slots=True)
+class FeedSchedule:
+    """Refresh statistics and schedule of one feed.
+
+    Attributes:
+        interval: Current refresh interval in seconds.
+        post_interval: EWMA of the gap between posts (``None`` until a
+            download had dated entries).
+        not_modified_rate: EWMA of the "unchanged" indicator (0..1).
+        checks: Upstream checks recorded.
+        changes: Checks that returned new content.
+        next_due: Wall-clock time the next refresh is due.
+        failures: Consecutive failed checks (reset by a successful one).
+    """
+
+    interval: float
+    post_interval: float | None = None
+    not_modified_rate: float = 0.0
+    checks: int = 0
+    changes: int = 0
+    next_due: float = 0.0
+    failures: int = 0
+
+
+def posting_interval(parsed: dict) -> float | None:
+    """Estimate a feed's mean gap between posts in seconds.
+
+    Averages over the newest entries up to now, so a feed that went quiet
+    after a burst is not treated as busy.
+    """
+    stamps = sorted(
+        (
+            published.timestamp()
+            for e in parsed.get("entries", [])[: _SAMPLE_ENTRIES * 2]
+            if (published := entry_published(e)) is not None
+        ),
+        reverse=True,
+    )[:_SAMPLE_ENTRIES]
+    if not stamps:
+        return None
+    return max(time.time() - stamps[-1], 0.0) / len(stamps)
+
+
+class RefreshScheduler:
+    """Tracks per-feed refresh intervals.
+
+    Args:
+        min_interval: Lower bound of any feed's interval.
+        max_interval: Upper bound of any feed's interval.
+        jitter: Relative random spread applied to each interval.
+        max_feeds: Feeds whose statistics are kept (LRU).
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        jitter: float = 0.1,
+        max_feeds: int = 1024,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._feeds: LRUCache = LRUCache(maxsize=max_feeds)
+        self._lock = threading.Lock()
+
+    def interval(self, url: str) -> float:
+        """Return the refresh interval of ``url`` in seconds.
+
+        Feeds not observed yet use ``cache_ttl_seconds``.
+        """
+        with self._lock:
+            feed: FeedSchedule | None = self._feeds.get(url)
+        return feed.interval if feed else float(settings.cache_ttl_seconds)
+
+    def observe(self, url: str, changed: bool, parsed: dict | None = None) -> float:
+        """Record an upstream check of ``url`` and reschedule it.
+
+        Args:
+            url: Feed URL.
+            changed: Whether the check returned new content.
+            parsed: The feed's parsed content (used to estimate how often
+                it posts when ``changed``).
+
+        Returns:
+            float: The feed's new refresh interval.
+        """
+        gap = posting_interval(parsed) if changed and parsed is not None else None
+        with self._lock:
+            feed = self._feeds.get(url)
+            if feed is None:
+                feed = FeedSchedule(interval=float(settings.cache_ttl_seconds))
+                self._feeds[url] = feed
+            feed.checks += 1
+            feed.changes += changed
+            feed.failures = 0
+            feed.not_modified_rate += _ALPHA * (
+                (not changed) - feed.not_modified_rate
+            )
+            if gap is not None:
+                feed.post_interval = (
+                    gap
+                    if feed.post_interval is None
+                    else feed.post_interval + _ALPHA * (gap - feed.post_interval)
+                )
+            feed.interval = self._next_interval(feed)
+            feed.next_due = time.time() + feed.interval
+            return feed.interval
+
+    def fail(self, url: str) -> float:
+        """Record a failed upstream check of ``url`` and back off.
+
+        The retry delay doubles with every consecutive failure, starting
+        at ``min_interval`` and capped at ``max_interval``; the feed's
+        regular interval is kept for when it recovers.
+
+        Returns:
+            float: Seconds until the next attempt.
+        """
+        with self._lock:
+            feed = self._feeds.get(url)
+            if feed is None:
+                feed = FeedSchedule(interval=float(settings.cache_ttl_seconds))
+                self._feeds[url] = feed
+            feed.failures += 1
+            delay = self.min_interval * 2.0 ** min(feed.failures - 1, 32)
+            delay *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+            delay = min(max(delay, self.min_interval), self.max_interval)
+            feed.next_due = time.time() + delay
+            return delay
+
+    def is_due(self, url: str) -> bool:
+        """Return whether ``url`` is due (feeds without a schedule are)."""
+        remaining = self.seconds_until_due((url,))
+        return remaining is None or remaining <= 0
+
+    def adopt(self, url: str, interval: float, checked_at: float) -> None:
+        """Take over the schedule another worker set after checking ``url``.
+
+        Reusing a peer's check does not count as a check here; the feed
+        becomes due ``interval`` seconds after ``checked_at``, the same
+        time as on the peer.
+        """
+        with self._lock:
+            feed = self._feeds.get(url)
+            if feed is None:
+                feed = FeedSchedule(interval=interval)
+                self._feeds[url] = feed
+            feed.interval = interval
+            feed.next_due = checked_at + interval
+
+    def fresh_for(self, url: str) -> float:
+        """Return seconds until ``url`` is due (its interval if unscheduled)."""
+        remaining = self.seconds_until_due((url,))
+        return self.interval(url) if remaining is None else remaining
+
+    def _next_interval(self, feed: FeedSchedule) -> float:
+        if feed.post_interval is None:
+            base = float(settings.cache_ttl_seconds)
+        else:
+            base = feed.post_interval / _CHECKS_PER_POST
+        # Back off feeds that keep answering "not modified".
+        base *= 1.0 + feed.not_modified_rate
+        base *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+        return min(max(base, self.min_interval), self.max_interval)
+
+    def seconds_until_due(self, urls: Iterable[str]) -> float | None:
+        """Return seconds until the first of ``urls`` is due.
+
+        The result is ``<= 0`` when one is overdue and ``None`` when none
+        of them has a schedule yet.
+        """
+        with self._lock:
+            due = [s.next_due for u in urls if (s := self._feeds.get(u)) is not None]
+        return min(due) - time.time() if due else None
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return per-feed schedule statistics as plain dicts."""
+        with self._lock:
+            return {url: asdict(s) for url, s in self._feeds.items()}
+
+
+schedule = RefreshScheduler(
+    min_interval=settings.refresh_min_interval_seconds,
+    max_interval=settings.refresh_max_interval_seconds,
+    jitter=settings.refresh_jitter,
+)
+
+
+def _collect() -> list[Counter]:
+    feeds = schedule.snapshot()
+    labels = ("feed",)
+    return [
+        sample(Gauge, "nt_feed_refresh_interval_seconds",
+               "Adaptive refresh interval per feed.",
+               {(u,): f["interval"] for u, f in feeds.items()}, labels),
+        sample(Gauge, "nt_feed_not_modified_ratio",
+               "EWMA of unchanged upstream checks per feed.",
+               {(u,): f["not_modified_rate"] for u, f in feeds.items()}, labels),
+    ]
+
+
+registry.add_collector(_collect)
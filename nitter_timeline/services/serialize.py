@@ -0,0 +1,95 @@
+"""Compact, pre-serialized JSON encoding of timeline responses.
+
+Each :class:`FeedItem` memoizes its encoded JSON per field selection, so a
+timeline response is assembled by concatenating cached byte strings. The
+``raw`` feedparser entry is left out unless explicitly selected. Encoding
+uses *orjson* when installed (``fast`` extra) and falls back to the
+standard library otherwise.
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from pydantic.json import pydantic_encoder
+
+from nitter_timeline.models.feed import AggregatedTimeline, FeedItem
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None  # type: ignore[assignment]
+
+ITEM_FIELDS: tuple[str, ...] = tuple(FeedItem.__fields__)
+DEFAULT_FIELDS: tuple[str, ...] = tuple(f for f in ITEM_FIELDS if f != "raw")
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, tuple):  # e.g. time.struct_time inside ``raw``
+        return list(obj)
+    return pydantic_encoder(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Validate a comma-separated ``fields`` selector.
+
+    Args:
+        fields: e.g. ``"id,author,published"``; ``None`` selects every
+            field except ``raw``.
+
+    Returns:
+        tuple[str, ...]: Field names in model order.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    if not fields:
+        return DEFAULT_FIELDS
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    if unknown := wanted.difference(ITEM_FIELDS):
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(f for f in ITEM_FIELDS if f in wanted)
+
+
+def item_json(item: FeedItem, fields: tuple[str, ...] = DEFAULT_FIELDS) -> bytes:
+    """Return the item's JSON for ``fields``, encoding it only once."""
+    cached = item._json_cache.get(fields)  # pylint: disable=protected-access
+    if cached is None:
+        cached = dumps({f: getattr(item, f) for f in fields})
+        item._json_cache[fields] = cached  # pylint: disable=protected-access
+    return cached
+
+
+def items_json(
+    items: Iterable[FeedItem], fields: tuple[str, ...] = DEFAULT_FIELDS
+) -> bytes:
+    """Return a JSON array of items assembled from cached encodings."""
+    return b"[" + b",".join(item_json(i, fields) for i in items) + b"]"
+
+
+def timeline_json(
+    timeline: AggregatedTimeline, fields: tuple[str, ...] = DEFAULT_FIELDS
+) -> bytes:
+    """Encode a timeline page (same shape as :class:`AggregatedTimeline`)."""
+    return (
+        b'{"items":'
+        + items_json(timeline.items, fields)
+        + b',"next_cursor":'
+        + dumps(timeline.next_cursor)
+        + b',"prev_cursor":'
+        + dumps(timeline.prev_cursor)
+        + b"}"
+    )
@@ -0,0 +1,234 @@
+"""Cross-process feed cache shared by the server's worker processes.
+
+With ``--workers N`` every worker has its own in-memory fetch cache. A
+shared backend lets them reuse each other's downloads: the raw feed body
+and its validators are published after every upstream fetch, and a lease
+ensures only one worker refreshes a given feed at a time while the
+others wait for (and parse) its result.
+
+Backends implement :class:`SharedCache`; ``shared_cache_backend`` picks
+one (``none`` disables sharing, ``sqlite`` uses a WAL-mode database file
+that all workers on the host open).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from nitter_timeline.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_feeds (
+    url TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    refresh_interval REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS leases (
+    url TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+@dataclass(slots=True)
+class SharedEntry:
+    """A feed download published to the shared cache.
+
+    Attributes:
+        version: Digest of the raw body (equal versions need no re-parse).
+        fetched_at: Wall-clock time of the last download or ``304``.
+        etag: ``ETag`` response header of the download.
+        last_modified: ``Last-Modified`` response header of the download.
+        body: Raw feed body (``None`` when only metadata was requested).
+        interval: Refresh interval the publishing worker scheduled after
+            its check (``0`` if unknown); peers adopt it so the feed is
+            checked on one shared cadence.
+    """
+
+    version: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    body: bytes | None = None
+    interval: float = 0.0
+
+
+class SharedCache(ABC):
+    """Interface of a cross-process feed cache with per-feed leases.
+
+    All methods are blocking; async callers run them in a thread.
+    """
+
+    @abstractmethod
+    def peek(self, url: str) -> SharedEntry | None:
+        """Return the metadata of ``url``'s entry without its body."""
+
+    @abstractmethod
+    def get(self, url: str) -> SharedEntry | None:
+        """Return ``url``'s entry including its body."""
+
+    @abstractmethod
+    def put(self, url: str, entry: SharedEntry) -> None:
+        """Publish a fresh download of ``url``."""
+
+    @abstractmethod
+    def touch(self, url: str, fetched_at: float, interval: float = 0.0) -> None:
+        """Mark ``url``'s entry as revalidated (``304``) at ``fetched_at``.
+
+        ``interval`` replaces the entry's refresh interval when given.
+        """
+
+    @abstractmethod
+    def acquire(self, url: str, owner: str, ttl: float) -> bool:
+        """Try to take the refresh lease of ``url`` for ``ttl`` seconds.
+
+        Returns:
+            bool: ``True`` when ``owner`` now holds the lease (an expired
+            lease of another owner is taken over).
+        """
+
+    @abstractmethod
+    def release(self, url: str, owner: str) -> None:
+        """Give up ``owner``'s lease of ``url`` (no-op if not held)."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class SQLiteSharedCache(SharedCache):
+    """Shared cache in a SQLite database file (one host, many processes).
+
+    Attributes:
+        path: Database file path.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # Short transactions only; wait rather than fail on a busy writer.
+        self._conn = sqlite3.connect(
+            path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(shared_feeds)")}
+        if "refresh_interval" not in columns:  # file created by an older version
+            self._conn.execute(
+                "ALTER TABLE shared_feeds ADD COLUMN refresh_interval REAL NOT NULL DEFAULT 0"
+            )
+
+    def peek(self, url: str) -> SharedEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, fetched_at, etag, last_modified, refresh_interval "
+                "FROM shared_feeds WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return SharedEntry(*row[:4], interval=row[4]) if row else None
+
+    def get(self, url: str) -> SharedEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, fetched_at, etag, last_modified, refresh_interval, body "
+                "FROM shared_feeds WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return SharedEntry(*row[:4], body=zlib.decompress(row[5]), interval=row[4])
+
+    def put(self, url: str, entry: SharedEntry) -> None:
+        row = (
+            url,
+            entry.version,
+            entry.fetched_at,
+            entry.etag,
+            entry.last_modified,
+            zlib.compress(entry.body or b""),
+            entry.interval,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_feeds (url, version, fetched_at, etag, "
+                "last_modified, body, refresh_interval) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+    def touch(self, url: str, fetched_at: float, interval: float = 0.0) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE shared_feeds SET fetched_at = MAX(fetched_at, ?), "
+                "refresh_interval = CASE WHEN ? > 0 THEN ? ELSE refresh_interval END "
+                "WHERE url = ?",
+                (fetched_at, interval, interval, url),
+            )
+
+    def acquire(self, url: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # Single atomic upsert: only replaces an expired (or own) lease.
+            cur = self._conn.execute(
+                "INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT (url) DO UPDATE "
+                "SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.expires < ? OR leases.owner = excluded.owner",
+                (url, owner, now + ttl, now),
+            )
+        return cur.rowcount == 1
+
+    def release(self, url: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM leases WHERE url = ? AND owner = ?", (url, owner)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared: SharedCache | None = None
+_shared_lock = threading.Lock()
+
+
+def _default_path() -> str:
+    return os.path.join(tempfile.gettempdir(), "nitter-timeline-shared.sqlite3")
+
+
+def get_shared_cache() -> SharedCache | None:
+    """Return the configured shared cache, or ``None`` when sharing is off."""
+    global _shared  # pylint: disable=global-statement
+    if _shared is None and settings.shared_cache_backend != "none":
+        with _shared_lock:
+            if _shared is None:
+                # Only one backend so far; new ones plug in here.
+                _shared = SQLiteSharedCache(
+                    settings.shared_cache_path or _default_path()
+                )
+    return _shared
+
+
+def close_shared_cache() -> None:
+    """Close the process-wide shared cache (application shutdown)."""
+    global _shared  # pylint: disable=global-statement
+    if _shared is not None:
+        try:
+            _shared.close()
+        except sqlite3.Error as exc:
+            logger.warning("closing shared cache failed: %s", exc)
+        _shared = None
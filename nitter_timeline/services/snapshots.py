@@ -0,0 +1,265 @@
+"""Compact feed snapshots in a byte-budgeted cache.
+
+*feedparser* results carry much more than the timeline needs (``*_detail``
+structures, duplicated ``summary`` / ``content`` HTML, namespaces, ...).
+:func:`compact_feed` reduces a parsed feed to the fields the aggregator
+and scheduler read, and :class:`SnapshotCache` keeps the last known
+snapshot of each feed in an LRU bounded by an (approximate) byte budget
+instead of an entry count. Snapshots can optionally be stored
+zlib-compressed; decoded copies are shared while anything still
+references them, so identity-keyed caches downstream keep working.
+"""
+from __future__ import annotations
+
+import pickle
+import sys
+import threading
+import weakref
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from cachetools import LRUCache
+
+# Entry keys kept by :func:`compact_feed` (besides ``content``/``author_detail``).
+_ENTRY_KEYS = (
+    "id",
+    "guid",
+    "link",
+    "title",
+    "author",
+    "summary",
+    "published",
+    "updated",
+)
+_MISSING = object()
+
+
+class FeedSnapshot(dict):
+    """Compact parsed feed (a ``dict`` that supports weak references)."""
+
+    __slots__ = ("__weakref__",)
+
+
+def _compact_entry(entry: dict) -> dict:
+    out = {k: v for k in _ENTRY_KEYS if (v := entry.get(k)) is not None}
+    for key in ("published_parsed", "updated_parsed"):
+        if (value := entry.get(key)) is not None:
+            out[key] = tuple(value)
+    if href := (entry.get("author_detail") or {}).get("href"):
+        out["author_detail"] = {"href": href}
+    content = entry.get("content")
+    if content and (value := content[0].get("value")) and value != out.get("summary"):
+        out["content"] = [{"value": value}]
+    return out
+
+
+def compact_feed(parsed: dict) -> FeedSnapshot:
+    """Reduce a *feedparser* result to the fields the timeline uses.
+
+    Entries keep identity, text, author and date fields (``*_parsed``
+    structs as plain tuples); ``content`` is dropped when it only repeats
+    ``summary``.
+
+    Args:
+        parsed: Structure returned by *feedparser.parse*.
+
+    Returns:
+        FeedSnapshot: Compact, picklable feed.
+    """
+    feed = parsed.get("feed") or {}
+    snapshot = FeedSnapshot(
+        feed={k: feed[k] for k in ("title", "link") if k in feed},
+        entries=[_compact_entry(e) for e in parsed.get("entries", [])],
+        bozo=bool(parsed.get("bozo")),
+    )
+    if "bozo_exception" in parsed:
+        snapshot["bozo_exception"] = str(parsed["bozo_exception"])
+    return snapshot
+
+
+def estimate_size(obj: object) -> int:
+    """Approximate the memory held by a snapshot (containers + leaves)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, list | tuple):
+        size += sum(estimate_size(v) for v in obj)
+    return size
+
+
+@dataclass(slots=True)
+class CachedFeed:
+    """Parsed feed plus the HTTP validators needed to revalidate it.
+
+    Attributes:
+        parsed: Compact feed (see :func:`compact_feed`).
+        etag: ``ETag`` response header of the last full download.
+        last_modified: ``Last-Modified`` response header of the last full
+            download.
+        version: Digest of the raw body the entry was parsed from.
+        fetched_at: Wall-clock time of the last download or revalidation.
+    """
+
+    parsed: dict
+    etag: str | None = None
+    last_modified: str | None = None
+    version: str = ""
+    fetched_at: float = 0.0
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return request headers for a conditional GET of this feed."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(slots=True)
+class SnapshotStats:
+    """Counters of a :class:`SnapshotCache`.
+
+    Attributes:
+        hits: Lookups that found a snapshot.
+        misses: Lookups that found none.
+        evictions: Snapshots dropped to stay within the byte budget
+            (including ones larger than the whole budget).
+        bytes: Approximate bytes currently held.
+        max_bytes: Byte budget.
+        entries: Snapshots currently held.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+    entries: int = 0
+
+
+class _BudgetLRU(LRUCache):
+    """LRU over ``(entry, size)`` pairs that counts evictions."""
+
+    def __init__(self, max_bytes: int, stats: SnapshotStats) -> None:
+        super().__init__(maxsize=max_bytes, getsizeof=lambda pair: pair[1])
+        self._stats = stats
+
+    def popitem(self) -> tuple:
+        item = super().popitem()
+        self._stats.evictions += 1
+        return item
+
+
+class SnapshotCache:
+    """Last known :class:`CachedFeed` per URL within a byte budget.
+
+    Supports the mapping operations the fetcher needs (``get``, item
+    access/assignment/deletion, ``in``, ``len``, ``clear``). With
+    ``compress`` the parsed snapshot is stored pickled and zlib-compressed,
+    so :meth:`get` returns a new :class:`CachedFeed`; callers that change
+    an entry's metadata must assign it back.
+
+    Args:
+        max_bytes: Approximate memory budget for all snapshots.
+        compress: Store snapshots compressed.
+    """
+
+    def __init__(self, max_bytes: int, compress: bool = False) -> None:
+        self.compress = compress
+        self._stats = SnapshotStats(max_bytes=max_bytes)
+        self._entries = _BudgetLRU(max_bytes, self._stats)
+        # (url, version) -> decoded snapshot still referenced elsewhere
+        self._decoded: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, default: object = None) -> CachedFeed | None:
+        """Return the entry of ``url`` (counted as a hit or miss)."""
+        with self._lock:
+            pair = self._entries.get(url)
+            if pair is None:
+                self._stats.misses += 1
+                return default  # type: ignore[return-value]
+            self._stats.hits += 1
+        entry: CachedFeed = pair[0]
+        if not self.compress:
+            return entry
+        return CachedFeed(
+            self._decode(url, entry),
+            entry.etag,
+            entry.last_modified,
+            entry.version,
+            entry.fetched_at,
+        )
+
+    def _decode(self, url: str, stored: CachedFeed) -> dict:
+        key = (url, stored.version)
+        snapshot = self._decoded.get(key)
+        if snapshot is None:
+            snapshot = pickle.loads(zlib.decompress(stored.parsed))
+            if isinstance(snapshot, FeedSnapshot):
+                self._decoded[key] = snapshot
+        return snapshot
+
+    def __getitem__(self, url: str) -> CachedFeed:
+        entry = self.get(url, _MISSING)
+        if entry is _MISSING:
+            raise KeyError(url)
+        return entry
+
+    def __setitem__(self, url: str, entry: CachedFeed) -> None:
+        with self._lock:
+            current = self._entries.get(url)
+        if not self.compress:
+            same = current is not None and current[0].parsed is entry.parsed
+            pair = (entry, current[1] if same else estimate_size(entry.parsed))
+        else:
+            if current is not None and entry.version and current[0].version == entry.version:
+                blob = current[0].parsed  # metadata update only
+            else:
+                blob = zlib.compress(pickle.dumps(entry.parsed, pickle.HIGHEST_PROTOCOL))
+            if isinstance(entry.parsed, FeedSnapshot):
+                self._decoded[(url, entry.version)] = entry.parsed
+            stored = CachedFeed(
+                blob, entry.etag, entry.last_modified, entry.version, entry.fetched_at
+            )
+            pair = (stored, len(blob) + sys.getsizeof(stored))
+        with self._lock:
+            try:
+                self._entries[url] = pair
+            except ValueError:  # larger than the whole budget
+                self._entries.pop(url, None)
+                self._stats.evictions += 1
+
+    def __delitem__(self, url: str) -> None:
+        with self._lock:
+            del self._entries[url]
+
+    def __contains__(self, url: object) -> bool:
+        with self._lock:
+            return url in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def clear(self) -> None:
+        """Drop every snapshot (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> SnapshotStats:
+        """Return a copy of the counters with current byte usage."""
+        with self._lock:
+            return SnapshotStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                bytes=int(self._entries.currsize),
+                max_bytes=self._stats.max_bytes,
+                entries=len(self._entries),
+            )
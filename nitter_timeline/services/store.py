@@ -0,0 +1,199 @@
+"""Optional SQLite persistence for feed snapshots and normalized items.
+
+Enabled by setting ``store_path``. The database runs in WAL mode so
+readers never block the writer, and writes are buffered and flushed in
+batches. On startup the stored feed bodies and validators hydrate the
+fetcher's snapshot cache (warm start); stored items extend each feed's
+history beyond the window the Nitter RSS endpoint currently returns, up to
+``store_history_per_feed`` items per feed (older rows are pruned on flush).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from nitter_timeline.core.config import settings
+from nitter_timeline.models.feed import FeedRecord
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    feed_url TEXT NOT NULL,
+    id TEXT NOT NULL,
+    published REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (feed_url, id)
+);
+CREATE INDEX IF NOT EXISTS items_feed_published ON items (feed_url, published DESC);
+"""
+# Record fields kept in ``items.data`` (``published`` has its own column,
+# ``raw`` is never persisted).
+_ITEM_FIELDS = (
+    "id", "author", "author_url", "content_html", "summary", "link", "avatar_url", "kind",
+)
+
+
+@dataclass(slots=True)
+class StoredFeed:
+    """Feed body and validators as persisted by the last full download."""
+
+    url: str
+    etag: str | None
+    last_modified: str | None
+    body: bytes
+
+
+class ItemStore:
+    """Thread-safe SQLite store with buffered, batched writes.
+
+    Attributes:
+        path: Database file path.
+        batch_size: Pending rows that trigger an automatic flush.
+        keep_per_feed: Newest items kept per feed; older rows are deleted
+            when the feed's items are flushed.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, keep_per_feed: int = 500) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.keep_per_feed = keep_per_feed
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending_feeds: dict[str, tuple] = {}
+        self._pending_items: dict[tuple[str, str], tuple] = {}
+
+    def save_feed(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        body: bytes,
+    ) -> None:
+        """Buffer the latest body and validators of ``url``."""
+        row = (url, etag, last_modified, zlib.compress(body), time.time())
+        with self._lock:
+            self._pending_feeds[url] = row
+        self._maybe_flush()
+
+    def add_items(self, url: str, items: Iterable[FeedRecord]) -> None:
+        """Buffer normalized items of ``url`` (``raw`` is not persisted)."""
+        with self._lock:
+            for item in items:
+                published = item.published.timestamp() if item.published else None
+                data = json.dumps({f: getattr(item, f) for f in _ITEM_FIELDS})
+                self._pending_items[(url, item.id)] = (url, item.id, published, data)
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending_feeds) + len(self._pending_items) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered rows in a single transaction.
+
+        Feeds that received items are trimmed to their ``keep_per_feed``
+        newest rows in the same transaction.
+        """
+        with self._lock:
+            feeds = list(self._pending_feeds.values())
+            items = list(self._pending_items.values())
+            self._pending_feeds.clear()
+            self._pending_items.clear()
+            if not feeds and not items:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)", feeds
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?)", items
+                )
+                self._conn.executemany(
+                    "DELETE FROM items WHERE feed_url = ? AND id NOT IN ("
+                    "SELECT id FROM items WHERE feed_url = ? "
+                    "ORDER BY published DESC LIMIT ?)",
+                    [(url, url, self.keep_per_feed) for url in {row[0] for row in items}],
+                )
+
+    def load_feeds(self) -> Iterator[StoredFeed]:
+        """Yield every persisted feed (used for warm start)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, etag, last_modified, body FROM feeds"
+            ).fetchall()
+        for url, etag, last_modified, body in rows:
+            yield StoredFeed(url, etag, last_modified, zlib.decompress(body))
+
+    def history(self, url: str, limit: int) -> list[FeedRecord]:
+        """Return up to ``limit`` stored items of ``url``, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT published, data FROM items WHERE feed_url = ? "
+                "ORDER BY published DESC LIMIT ?",
+                (url, limit),
+            ).fetchall()
+        records = []
+        for published, data in rows:
+            fields = json.loads(data)
+            records.append(
+                FeedRecord(
+                    **{f: fields[f] for f in _ITEM_FIELDS if f in fields},
+                    published=datetime.fromtimestamp(published, UTC)
+                    if published is not None
+                    else None,
+                )
+            )
+        return records
+
+    def close(self) -> None:
+        """Flush pending writes and close the connection."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+_store: ItemStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ItemStore | None:
+    """Return the process-wide store, or ``None`` when persistence is off."""
+    global _store  # pylint: disable=global-statement
+    if _store is None and settings.store_path:
+        with _store_lock:
+            if _store is None:
+                _store = ItemStore(
+                    settings.store_path,
+                    settings.store_batch_size,
+                    settings.store_history_per_feed,
+                )
+    return _store
+
+
+def close_store() -> None:
+    """Flush and close the process-wide store (application shutdown)."""
+    global _store  # pylint: disable=global-statement
+    if _store is not None:
+        try:
+            _store.close()
+        except sqlite3.Error as exc:
+            logger.warning("closing item store failed: %s", exc)
+        _store = None
@@ -0,0 +1,129 @@
+"""Sorted in-memory index over a feed set for cursor pagination.
+
+A :class:`TimelineIndex` holds the merged, de-duplicated items of one feed
+set ordered by :func:`item_key`. Pages
+are located with a binary search on that key, so fetching a page costs
+``O(log n + page)`` once the index exists. Indexes are cached per feed set
+and rebuilt only when one of the underlying feeds changes.
+
+Cursors are opaque URL-safe strings encoding a direction plus the
+``(published, id)`` key of the item at the page boundary.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import bisect
+import heapq
+import threading
+from collections.abc import Mapping
+from typing import Literal
+
+from cachetools import LRUCache
+
+from nitter_timeline.models.feed import FeedRecord
+
+SortKey = tuple[float, str]
+Direction = Literal["next", "prev"]
+
+_indexes: LRUCache = LRUCache(maxsize=128)
+_lock = threading.Lock()
+
+
+def item_key(item: FeedRecord) -> SortKey:
+    """Return the ascending index key (newest first, then by ID)."""
+    ts = item.published.timestamp() if item.published else 0.0
+    return (-ts, item.id)
+
+
+def encode_cursor(direction: Direction, key: SortKey) -> str:
+    """Encode a page boundary as an opaque cursor string."""
+    raw = f"{direction[0]}:{-key[0]!r}:{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[Direction, SortKey]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode()
+        tag, ts, item_id = raw.split(":", 2)
+        direction: Direction = {"n": "next", "p": "prev"}[tag]
+        return direction, (-float(ts), item_id)
+    except (binascii.Error, UnicodeError, KeyError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+class TimelineIndex:
+    """Merged, de-duplicated and sorted items of one feed set.
+
+    Attributes:
+        streams: Per-feed item lists the index was built from (used to
+            detect when a rebuild is needed).
+        items: Unique items in index order.
+        keys: ``item_key`` of each entry in ``items`` (bisect target).
+    """
+
+    __slots__ = ("items", "keys", "streams")
+
+    def __init__(self, streams: Mapping[str, list[FeedRecord]]) -> None:
+        self.streams = dict(streams)
+        self.items: list[FeedRecord] = []
+        self.keys: list[SortKey] = []
+        seen: set[str] = set()
+        for item in heapq.merge(*self.streams.values(), key=item_key):
+            if item.id in seen:
+                continue
+            seen.add(item.id)
+            self.items.append(item)
+            self.keys.append(item_key(item))
+
+    def is_current(self, streams: Mapping[str, list[FeedRecord]]) -> bool:
+        """Whether the index was built from exactly these feed lists."""
+        return streams.keys() == self.streams.keys() and all(
+            streams[url] is self.streams[url] for url in streams
+        )
+
+    def page(
+        self, direction: Direction, key: SortKey, limit: int
+    ) -> tuple[list[FeedRecord], bool]:
+        """Return the page adjacent to ``key`` and whether more exist beyond.
+
+        Args:
+            direction: ``next`` for older items, ``prev`` for newer ones.
+            key: Boundary key (exclusive).
+            limit: Page size.
+
+        Returns:
+            tuple[list[FeedRecord], bool]: Items in index order and whether
+            further items exist in the same direction.
+        """
+        if direction == "next":
+            start = bisect.bisect_right(self.keys, key)
+            end = start + limit
+            return self.items[start:end], end < len(self.items)
+        end = bisect.bisect_left(self.keys, key)
+        start = max(0, end - limit)
+        return self.items[start:end], start > 0
+
+
+def get_index(
+    streams: Mapping[str, list[FeedRecord]], variant: str = ""
+) -> TimelineIndex:
+    """Return the cached index for this feed set, rebuilding if stale.
+
+    ``variant`` keeps separate indexes for differently filtered views of
+    the same feed set.
+    """
+    feed_set = (variant, *sorted(streams))
+    with _lock:
+        index = _indexes.get(feed_set)
+    if index is None or not index.is_current(streams):
+        index = TimelineIndex(streams)
+        with _lock:
+            _indexes[feed_set] = index
+    return index
@@ -0,0 +1,105 @@
+"""Feed URL validation (scheme, domain allow list and SSRF checks).
+
+Host resolution runs through the event loop's ``getaddrinfo`` (executed in
+a worker thread) so a slow resolver never blocks other requests. Each
+host's verdict is memoized for ``dns_cache_ttl_seconds``.
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+from collections.abc import Iterable
+from urllib.parse import urlparse
+
+from cachetools import TTLCache
+
+from nitter_timeline.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_host_verdicts: TTLCache = TTLCache(maxsize=1024, ttl=settings.dns_cache_ttl_seconds)
+
+
+def allowed_host(url: str) -> str | None:
+    """Return the URL's host if scheme and domain are allowed, else ``None``.
+
+    Only the static checks; see :func:`is_allowed_feed_url` for the
+    address (SSRF) check.
+    """
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+    if parsed.scheme not in settings.allowed_feed_schemes:
+        return None
+    if settings.enforce_https_feeds and parsed.scheme != "https":
+        return None
+    host = parsed.hostname or ""
+    if not any(
+        host.endswith(suf) for suf in settings.allowed_feed_domain_suffixes
+    ):
+        return None
+    return host
+
+
+async def _host_is_public(host: str) -> bool:
+    """Return whether ``host`` resolves only to public addresses.
+
+    Verdicts are cached per host; resolver errors are not cached so a
+    transient failure does not block a feed for the whole TTL. Hosts that
+    cannot be IDNA-encoded (e.g. empty labels) are rejected.
+    """
+    verdict = _host_verdicts.get(host)
+    if verdict is not None:
+        return verdict
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None)
+    except (OSError, UnicodeError) as exc:
+        logger.warning("resolve failed %s: %s", host, exc)
+        return False
+    verdict = True
+    for info in infos:
+        ip = ipaddress.ip_address(info[4][0])
+        if ip.is_private or ip.is_loopback or ip.is_link_local:
+            verdict = False
+            break
+    _host_verdicts[host] = verdict
+    return verdict
+
+
+async def is_allowed_feed_url(url: str) -> bool:
+    """Return whether ``url`` passes the feed scheme/domain/SSRF checks.
+
+    The host must match one of ``allowed_feed_domain_suffixes`` and must not
+    resolve to a private, loopback or link-local address.
+
+    Args:
+        url: Candidate feed URL supplied by a client or the settings.
+
+    Returns:
+        bool: ``True`` when the URL may be fetched.
+    """
+    host = allowed_host(url)
+    return host is not None and await _host_is_public(host)
+
+
+async def filter_feed_urls(urls: Iterable[str]) -> list[str]:
+    """Keep the allowed URLs, capped at ``max_feeds_per_request``.
+
+    Distinct hosts are resolved concurrently; input order is preserved.
+
+    Args:
+        urls: Candidate feed URLs.
+
+    Returns:
+        list[str]: URLs that may be fetched.
+    """
+    candidates = [(u, h) for u in urls if (h := allowed_host(u))]
+    hosts = list(dict.fromkeys(h for _u, h in candidates))
+    verdicts = dict(
+        zip(hosts, await asyncio.gather(*(_host_is_public(h) for h in hosts)), strict=True)
+    )
+    filtered = [u for u, h in candidates if verdicts[h]]
+    return filtered[: settings.max_feeds_per_request]
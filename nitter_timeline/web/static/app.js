@@ -1,21 +1,86 @@
+function renderItem(item) {
+  const div = document.createElement('article');
+  div.className = 'tweet';
+  div.dataset.id = item.id;
+  div.dataset.ts = item.published ? Date.parse(item.published) : 0;
+  div.innerHTML = `
+    <div class="meta">${item.author || ''} ${item.published ? new Date(item.published).toLocaleString() : ''}</div>
+    <div class="content">${item.content_html || item.summary || ''}</div>
+  `;
+  return div;
+}
+
+// Insert keeping newest-first order while feeds are still arriving.
+function insertSorted(el, node) {
+  const ts = Number(node.dataset.ts);
+  for (const child of el.children) {
+    if (Number(child.dataset.ts) < ts) {
+      el.insertBefore(node, child);
+      return;
+    }
+  }
+  el.appendChild(node);
+}
+
+let liveSource = null;
+
+// Subscribe to pushed items newer than the newest one already shown.
+function subscribeLive(el, nodes, params, cursor) {
+  if (liveSource) liveSource.close();
+  const liveParams = new URLSearchParams(params);
+  if (cursor) liveParams.set('cursor', cursor);
+  liveSource = new EventSource('/api/timeline/live?' + liveParams.toString());
+  liveSource.addEventListener('items', (ev) => {
+    handleMessage(el, nodes, {type: 'items', items: JSON.parse(ev.data).items});
+  });
+}
+
+function handleMessage(el, nodes, msg) {
+  if (msg.type === 'items') {
+    for (const item of msg.items) {
+      if (nodes.has(item.id)) continue;
+      const node = renderItem(item);
+      nodes.set(item.id, node);
+      insertSorted(el, node);
+    }
+  } else if (msg.type === 'end') {
+    // Final merge: apply the server's order and drop items past the limit.
+    const keep = new Set(msg.order);
+    for (const [id, node] of nodes) {
+      if (!keep.has(id)) node.remove();
+    }
+    for (const id of msg.order) {
+      const node = nodes.get(id);
+      if (node) el.appendChild(node);
+    }
+  }
+}
+
 async function loadTimeline() {
   const feedsValue = document.getElementById('feeds').value.trim();
   const params = new URLSearchParams();
   if (feedsValue) {
     feedsValue.split(',').map(v => v.trim()).filter(Boolean).forEach(f => params.append('feeds', f));
   }
-  const res = await fetch('/api/timeline?' + params.toString(), {credentials: 'same-origin'});
-  const data = await res.json();
   const el = document.getElementById('timeline');
   el.innerHTML = '';
-  for (const item of data.items) {
-    const div = document.createElement('article');
-    div.className = 'tweet';
-    div.innerHTML = `
-      <div class="meta">${item.author || ''} ${item.published ? new Date(item.published).toLocaleString() : ''}</div>
-      <div class="content">${item.content_html || item.summary || ''}</div>
-    `;
-    el.appendChild(div);
+  const nodes = new Map();
+  const res = await fetch('/api/timeline/stream?' + params.toString(), {credentials: 'same-origin'});
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const {value, done} = await reader.read();
+    if (done) break;
+    buffer += value;
+    let nl;
+    while ((nl = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, nl);
+      buffer = buffer.slice(nl + 1);
+      if (!line) continue;
+      const msg = JSON.parse(line);
+      handleMessage(el, nodes, msg);
+      if (msg.type === 'end') subscribeLive(el, nodes, params, msg.latest_cursor);
+    }
   }
 }
 
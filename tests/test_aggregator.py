@@ -25,3 +25,184 @@ async def test_aggregate_basic():
     agg = aggregate([("u", fake_feed)], limit=10)
     assert len(agg.items) == 2
     assert isinstance(agg.items[0], FeedItem)
+
+
+def test_unchanged_entries_are_not_reparsed(monkeypatch):
+    from nitter_timeline.services import aggregator
+
+    feed = {"entries": [{"id": "x1", "author": "a", "summary": "one"}]}
+    first = aggregator.feed_items("u1", feed)
+    monkeypatch.setattr(aggregator, "_parse_entry", pytest.fail)
+    assert aggregator.feed_items("u1", feed) is first
+    # A copy of the feed misses the per-feed memo but hits the item cache.
+    assert aggregator.parse_items(dict(feed)) == first
+
+
+def _feed(*days):
+    return {
+        "entries": [
+            {"id": f"d{d}", "author": "a", "summary": str(d),
+             "published": f"2024-01-{d:02d}T00:00:00Z"}
+            for d in days
+        ]
+    }
+
+
+def test_aggregate_merges_feeds_newest_first_with_dedup():
+    agg = aggregate([("f1", _feed(1, 4, 5)), ("f2", _feed(2, 3, 5))], limit=4)
+    assert [i.summary for i in agg.items] == ["5", "4", "3", "2"]
+
+
+def test_cursor_pagination_walks_forward_and_back():
+    feeds = [("p1", _feed(1, 3, 5, 7)), ("p2", _feed(2, 4, 6))]
+    first = aggregate(feeds, limit=3)
+    assert [i.summary for i in first.items] == ["7", "6", "5"]
+    assert first.prev_cursor is None
+
+    second = aggregate(feeds, limit=3, cursor=first.next_cursor)
+    assert [i.summary for i in second.items] == ["4", "3", "2"]
+    third = aggregate(feeds, limit=3, cursor=second.next_cursor)
+    assert [i.summary for i in third.items] == ["1"]
+    assert third.next_cursor is None
+
+    back = aggregate(feeds, limit=3, cursor=second.prev_cursor)
+    assert [i.summary for i in back.items] == ["7", "6", "5"]
+
+    with pytest.raises(ValueError):
+        aggregate(feeds, cursor="not-a-cursor")
+
+
+def test_only_returned_items_are_validated():
+    from nitter_timeline.services.aggregator import feed_items
+
+    feed = {
+        "entries": [
+            {"id": "v-old", "author": "a", "summary": "old",
+             "published": "2024-02-01T00:00:00Z"},
+            {"id": "v-new", "author": "a", "summary": "new",
+             "published": "2024-02-02T00:00:00Z"},
+        ]
+    }
+    agg = aggregate([("v1", feed)], limit=1)
+    newest, older = feed_items("v1", feed)
+    assert agg.items[0] is newest.to_item()
+    assert older._item is None
+
+
+def test_mixed_naive_and_aware_dates_normalize_to_utc():
+    feed = {
+        "entries": [
+            {"id": "tz-naive", "author": "a", "summary": "n",
+             "published": "2024-03-01 12:00"},
+            {"id": "tz-rfc", "author": "a", "summary": "r",
+             "published": "Fri, 01 Mar 2024 13:00:00 +0200"},
+        ]
+    }
+    agg = aggregate([("tz", feed)], limit=10)
+    assert [i.summary for i in agg.items] == ["n", "r"]
+    assert all(i.published.utcoffset().total_seconds() == 0 for i in agg.items)
+
+
+def test_sanitize_caps_images_and_injects_attributes():
+    from nitter_timeline.services.sanitize import sanitize_html
+
+    html = "".join(f'<img src="https://x/{n}.png">' for n in range(3)) + "<script>x</script>"
+    out = sanitize_html(html, max_images=2)
+    assert out.count("<img") == 2
+    assert out.count('loading="lazy"') == 2
+    assert "<script>" not in out
+    assert sanitize_html(html, max_images=2) is out  # memoized
+
+
+def test_filter_rules_drop_muted_items_in_one_pass():
+    from nitter_timeline.services.filters import FilterRules, compile_rules
+
+    feed = {
+        "entries": [
+            {"id": "f1", "author": "@alice", "title": "hi", "summary": "Hello world"},
+            {"id": "f2", "author": "@bob", "title": "hey", "summary": "calm day"},
+            {"id": "f3", "author": "@carol", "title": "R to @bob: yes", "summary": "yes"},
+            {"id": "f4", "author": "@dave", "title": "RT by @x: go", "summary": "go"},
+            {"id": "f5", "author": "@erin", "title": "tag", "summary": "#Spoilers ahead"},
+            {"id": "f6", "author": "@frank", "title": "w", "summary": "worldwide news"},
+            {
+                "id": "f7",
+                "author": "@gina",
+                "title": "pic",
+                "summary": '<p>look</p><img src="https://nitter.net/pic/world.jpg">',
+            },
+        ]
+    }
+    rules = FilterRules.from_params(
+        keywords=["WORLD", "#spoilers"], authors=["Bob"], hide=["replies", "retweets"]
+    )
+    agg = aggregate([("filtered", feed)], limit=10, rules=rules)
+    # Keywords match the text only, not URLs in the markup.
+    assert [i.author for i in agg.items] == ["@frank", "@gina"]
+
+    # Equivalent rules (order / case) share one compiled filter.
+    same = FilterRules.from_params(["#Spoilers", "world"], ["@bob"], ["retweet", "reply"])
+    assert compile_rules(same) is compile_rules(rules)
+    with pytest.raises(ValueError):
+        FilterRules.from_params(hide=["quotes"])
+
+
+def test_same_status_across_mirrors_is_processed_once(monkeypatch):
+    from nitter_timeline.services import aggregator
+    from nitter_timeline.services.filters import FilterRules
+
+    def entry(host, title="hello", summary="hello"):
+        return {
+            "link": f"https://{host}/alice/status/987654321#m",
+            "author": "@alice",
+            "title": title,
+            "summary": summary,
+            "published": "2024-03-01T00:00:00Z",
+        }
+
+    calls = []
+    original = aggregator._parse_entry
+    monkeypatch.setattr(
+        aggregator, "_parse_entry", lambda e, i: calls.append(i) or original(e, i)
+    )
+    feeds = [
+        ("https://nitter.net/alice/rss", {"entries": [entry("nitter.net")]}),
+        ("https://nitter.pufe.org/alice/rss", {"entries": [entry("nitter.pufe.org")]}),
+        ("https://nitter.net/bob/rss", {"entries": [entry("nitter.net", "RT by @bob: hello")]}),
+    ]
+    agg = aggregate(feeds, limit=10)
+    assert [i.id for i in agg.items] == ["987654321"]
+    # One record for the status, one for the retweet (kept for kind rules).
+    assert calls == ["987654321", "987654321"]
+
+    only_bob = aggregate(feeds[2:], limit=10, rules=FilterRules.from_params(hide=["retweets"]))
+    assert only_bob.items == []
+
+    # An edited status is processed again.
+    edited = aggregate(
+        [("https://nitter.net/alice/rss", {"entries": [entry("nitter.net", summary="edited")]})],
+        limit=10,
+    )
+    assert edited.items[0].summary == "edited"
+    assert len(calls) == 3
+
+
+async def test_only_new_entries_are_sent_to_the_cpu_pool(monkeypatch):
+    from nitter_timeline.services import aggregator
+
+    sent = []
+
+    async def fake_run_cpu(func, entries):
+        sent.append([item_id for _e, item_id in entries])
+        return func(entries)
+
+    monkeypatch.setattr(aggregator, "run_cpu", fake_run_cpu)
+    old = {"id": "p1", "author": "a", "summary": "one"}
+    new = {"id": "p2", "author": "a", "summary": "two"}
+    first = await aggregator.load_feed_items("pool", {"entries": [old]})
+    assert await aggregator.load_feed_items("pool", {"entries": [new, old]}) != first
+    assert len(sent) == 2 and len(sent[1]) == 1
+    # Loaded streams feed the same parent-side index as the sync path.
+    streams = await aggregator.load_streams([("pool", {"entries": [old]})])
+    assert [i.summary for i in streams["pool"]] == ["one"]
+    assert len(sent) == 2
@@ -0,0 +1,92 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from nitter_timeline.api import routes
+from nitter_timeline.core.config import settings
+from nitter_timeline.core.metrics import registry
+from nitter_timeline.main import app
+from nitter_timeline.services import fetcher, validation
+from nitter_timeline.services.response_cache import timeline_cache
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><guid>https://nitter.net/a/status/1</guid><title>hi</title>
+<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate><description>x</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "poll_enabled", False)
+    monkeypatch.setitem(validation._host_verdicts, "nitter.net", True)
+    monkeypatch.setattr(
+        fetcher,
+        "_client",
+        httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda _r: httpx.Response(200, content=RSS))
+        ),
+    )
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+    timeline_cache.clear()
+    yield TestClient(app)
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+
+
+def test_stream_emits_items_then_end_marker(client):
+    feeds = ["https://nitter.net/a/rss", "https://nitter.net/b/rss"]
+    resp = client.get("/api/timeline/stream", params={"feeds": feeds})
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert [m["type"] for m in lines] == ["items", "end"]  # duplicate not re-sent
+    assert lines[-1]["order"] == [lines[0]["items"][0]["id"]]
+
+
+def test_timeline_is_compact_and_honours_fields(client):
+    params = {"feeds": ["https://nitter.net/a/rss"]}
+    item = client.get("/api/timeline", params=params).json()["items"][0]
+    assert "raw" not in item
+
+    selected = client.get("/api/timeline", params={**params, "fields": "id,raw"})
+    assert set(selected.json()["items"][0]) == {"id", "raw"}
+    assert client.get("/api/timeline", params={**params, "fields": "nope"}).status_code == 400
+
+
+def test_metrics_exposes_stage_timings_and_cache_counters(client, monkeypatch):
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(registry, "enabled", True)
+    client.get("/api/timeline", params={"feeds": ["https://nitter.net/m/rss"]})
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert 'nt_stage_duration_seconds_count{stage="parse"}' in body
+    assert 'nt_stage_duration_seconds_count{stage="serialize"}' in body
+    assert 'nt_cache_requests_total{cache="feed",result="miss"}' in body
+    assert "nt_fetch_bytes_total" in body
+    assert "# TYPE nt_fetch_coalesced_total counter" in body
+
+
+def test_unchanged_timeline_is_served_from_cache_and_revalidates(client, monkeypatch):
+    feeds = ["https://nitter.net/b/rss", "https://nitter.net/a/rss"]
+    first = client.get("/api/timeline", params={"feeds": feeds})
+    etag = first.headers["ETag"]
+    assert etag.startswith('"')
+
+    # Re-downloaded but identical content, feeds in another order: no
+    # aggregation, same entity.
+    fetcher._cache.clear()
+    monkeypatch.setattr(routes, "aggregate_streams", pytest.fail)
+    again = client.get("/api/timeline", params={"feeds": feeds[::-1]})
+    assert again.content == first.content
+    assert again.headers["ETag"] == etag
+    not_modified = client.get(
+        "/api/timeline", params={"feeds": feeds}, headers={"If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
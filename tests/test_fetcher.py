@@ -0,0 +1,268 @@
+import asyncio
+import dataclasses
+
+import httpx
+import pytest
+from cachetools import LRUCache
+
+from nitter_timeline.services import fetcher, validation
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><guid>https://nitter.net/a/status/1</guid><title>hi</title></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def transport_calls(monkeypatch):
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=RSS, headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(fetcher, "_client", client)
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+    yield calls
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+
+
+@pytest.mark.asyncio
+async def test_fetch_feed_revalidates_with_etag(transport_calls, monkeypatch):
+    url = "https://nitter.net/a/rss"
+    first = await fetcher.fetch_feed(url)
+    assert first["entries"][0]["title"] == "hi"
+
+    # Simulate TTL expiry; the stale entry must be revalidated, not reparsed.
+    fetcher._cache.clear()
+    monkeypatch.setattr(fetcher.feedparser, "parse", pytest.fail)
+    second = await fetcher.fetch_feed(url)
+
+    assert second is first
+    assert transport_calls[1].headers["If-None-Match"] == '"v1"'
+    assert url in fetcher._cache
+
+
+@pytest.mark.asyncio
+async def test_poller_serves_stale_snapshot(transport_calls, monkeypatch):
+    from nitter_timeline.services.poller import FeedPoller
+
+    url = "https://nitter.net/a/rss"
+    monkeypatch.setitem(validation._host_verdicts, "nitter.net", True)
+    poller = FeedPoller(interval=60, recent_ttl=60, max_tracked=8)
+
+    cold = await poller.get_many([url])
+    assert len(transport_calls) == 1
+    fetcher._cache.clear()
+
+    warm = await poller.get_many([url])
+    assert warm == cold
+    assert url in await poller.tracked()
+    await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_are_coalesced(transport_calls):
+    url = "https://nitter.net/a/rss"
+    before = fetcher.stats.coalesced
+    results = await asyncio.gather(*(fetcher.fetch_feed(url) for _ in range(5)))
+    assert len(transport_calls) == 1
+    assert all(r is results[0] for r in results)
+    assert fetcher.stats.coalesced - before == 4
+
+
+@pytest.mark.asyncio
+async def test_fetch_fails_over_to_healthy_mirror(monkeypatch):
+    from nitter_timeline.services.mirrors import MirrorPool
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "bad.nitter.net":
+            return httpx.Response(503)
+        return httpx.Response(200, content=RSS)
+
+    pool = MirrorPool(["https://bad.nitter.net", "https://good.nitter.net"])
+    monkeypatch.setattr(fetcher, "mirror_pool", pool)
+    monkeypatch.setattr(
+        fetcher, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    fetcher._cache.clear()
+
+    parsed = await fetcher.fetch_feed("https://bad.nitter.net/a/rss", force=True)
+    assert parsed["entries"][0]["title"] == "hi"
+    assert pool.health("https://bad.nitter.net").failures == 1
+    assert pool.candidates("https://bad.nitter.net/a/rss")[0].startswith(
+        "https://good.nitter.net"
+    )
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_reuses_peer_download(transport_calls, monkeypatch, tmp_path):
+    from nitter_timeline.services.shared_cache import SQLiteSharedCache
+
+    url = "https://nitter.net/a/rss"
+    path = str(tmp_path / "shared.sqlite3")
+    peer, own = SQLiteSharedCache(path), SQLiteSharedCache(path)
+
+    # The first worker downloads and publishes the feed.
+    monkeypatch.setattr(fetcher, "get_shared_cache", lambda: peer)
+    await fetcher.fetch_feed(url)
+    assert len(transport_calls) == 1
+
+    # A second worker (cold in-memory cache and schedule) adopts it, and
+    # the peer's refresh cadence, without a request.
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+    fetcher.schedule._feeds.clear()
+    monkeypatch.setattr(fetcher, "get_shared_cache", lambda: own)
+    parsed = await fetcher.fetch_feed(url)
+    assert parsed["entries"][0]["title"] == "hi"
+    assert len(transport_calls) == 1
+    published = peer.peek(url)
+    adopted = fetcher.schedule.snapshot()[url]
+    assert adopted["interval"] == published.interval > 0
+    assert adopted["next_due"] == published.fetched_at + published.interval
+    assert adopted["checks"] == 0
+
+    # While a peer holds the refresh lease, stale callers keep their snapshot.
+    fetcher._cache.clear()
+    peer.put(url, dataclasses.replace(peer.get(url), fetched_at=0.0))
+    monkeypatch.setattr(fetcher.settings, "shared_cache_lease_seconds", 0.2)
+    assert peer.acquire(url, "peer", ttl=30)
+    assert await fetcher.fetch_feed(url) is parsed
+    assert len(transport_calls) == 1
+    peer.close()
+    own.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_feed_backs_off(monkeypatch):
+    from nitter_timeline.services.poller import FeedPoller
+
+    url = "https://nitter.net/gone/rss"
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(200, content=RSS)
+        return httpx.Response(404)
+
+    monkeypatch.setattr(
+        fetcher, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setitem(validation._host_verdicts, "nitter.net", True)
+    monkeypatch.setattr(fetcher.schedule, "_feeds", LRUCache(maxsize=8))
+    poller = FeedPoller(interval=60, recent_ttl=60, max_tracked=8)
+
+    await poller.get_many([url])
+    # The interval elapses and the next check fails.
+    fetcher._cache.clear()
+    fetcher.schedule._feeds[url].next_due = 0.0
+    assert await poller.get_many([url])
+    await asyncio.gather(*poller._pending.values())
+    assert len(calls) == 2
+
+    # Backing off: neither requests nor poller rounds hit upstream again.
+    assert not fetcher.needs_refresh(url)
+    assert fetcher.schedule.seconds_until_due([url]) >= fetcher.schedule.min_interval * 0.9
+    await poller.get_many([url])
+    await poller.refresh([u for u in await poller.tracked() if fetcher.needs_refresh(u)])
+    assert len(calls) == 2
+    assert fetcher.schedule.snapshot()[url]["failures"] == 1
+    await poller.stop()
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+
+
+@pytest.mark.asyncio
+async def test_fan_out_stays_within_request_slots_without_spurious_hedges(monkeypatch):
+    from nitter_timeline.services.mirrors import MirrorPool
+
+    active: dict[str, int] = {}
+    peak = {"total": 0}
+    hosts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        hosts.append(host)
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        peak["total"] = max(peak["total"], sum(active.values()))
+        await asyncio.sleep(0.05)
+        active[host] -= 1
+        return httpx.Response(200, content=RSS)
+
+    monkeypatch.setattr(fetcher.settings, "fetch_concurrency", 5)
+    monkeypatch.setattr(fetcher.settings, "fetch_per_host_concurrency", 2)
+    monkeypatch.setattr(fetcher.settings, "mirror_hedge_delay_seconds", 0.08)
+    monkeypatch.setattr(fetcher, "_global_slots", None)
+    monkeypatch.setattr(fetcher, "_host_slots", {})
+    monkeypatch.setattr(
+        fetcher, "mirror_pool", MirrorPool(["https://a.nitter.net", "https://b.nitter.net"])
+    )
+    monkeypatch.setattr(
+        fetcher, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+
+    mirrored = [f"https://a.nitter.net/u{n}/rss" for n in range(10)]
+    others = [f"https://o{n % 2}.nitter.net/u{n}/rss" for n in range(6)]
+    await asyncio.gather(*(fetcher.fetch_feed(u, force=True) for u in mirrored + others))
+
+    assert peak["total"] <= 5
+    assert max(v for k, v in peak.items() if k != "total") <= 2
+    # Queueing on local slots is not mirror latency: no request was hedged.
+    assert len(hosts) == 16
+    assert "b.nitter.net" not in hosts
+    fetcher._cache.clear()
+    fetcher._validators.clear()
+
+
+def test_cancelled_attempts_only_raise_mirror_latency():
+    from nitter_timeline.services.mirrors import MirrorPool
+
+    pool = MirrorPool(["https://a.nitter.net", "https://b.nitter.net"])
+    pool.record("https://a.nitter.net/x/rss", 0.2, ok=True)
+    pool.observe_lower_bound("https://b.nitter.net/x/rss", 0.09)
+    pool.observe_lower_bound("https://a.nitter.net/x/rss", 0.05)
+    assert pool.health("https://a.nitter.net").latency == 0.2
+    assert pool.health("https://b.nitter.net").latency == 0.09
+    pool.observe_lower_bound("https://b.nitter.net/x/rss", 0.5)
+    assert pool.candidates("https://a.nitter.net/x/rss")[0].startswith("https://a.")
+
+
+@pytest.mark.asyncio
+async def test_close_client_cancels_inflight_downloads(monkeypatch):
+    from nitter_timeline.services.poller import FeedPoller
+
+    url = "https://nitter.net/slow/rss"
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(30)
+        return httpx.Response(200, content=RSS)
+
+    monkeypatch.setattr(
+        fetcher, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    fetcher._cache.clear()
+    poller = FeedPoller(interval=60, recent_ttl=60, max_tracked=8)
+    poller.schedule_refresh(url)
+    await started.wait()
+    task = fetcher._inflight[url]
+
+    # The poller's own task is gone, the shielded download is not.
+    await poller.stop()
+    assert not task.done()
+    await fetcher.close_client()
+    assert task.cancelled()
+    assert url not in fetcher._inflight
@@ -0,0 +1,69 @@
+import pytest
+
+from nitter_timeline.core.config import settings
+from nitter_timeline.services import fetcher
+from nitter_timeline.services.live import LiveHub
+from nitter_timeline.services.poller import poller
+
+
+def _feed(*days):
+    return {
+        "entries": [
+            {"id": f"d{d}", "author": "a", "summary": str(d),
+             "published": f"2024-01-{d:02d}T00:00:00Z"}
+            for d in days
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_diff_of_new_items(monkeypatch):
+    url = "https://nitter.net/live/rss"
+    monkeypatch.setitem(fetcher._validators, url, fetcher.CachedFeed(_feed(1, 2)))
+    monkeypatch.setattr(settings, "default_feeds", [])
+    monkeypatch.setattr(poller, "_sources", [])
+    hub = LiveHub()
+
+    async with hub.subscribe([url]) as (channel, q1), hub.subscribe([url]) as (same, q2):
+        assert same is channel
+        # Open channels stay tracked even after the request TTL expires.
+        poller._recent.clear()
+        assert await poller.tracked() == [url]
+        monkeypatch.setitem(fetcher._validators, url, fetcher.CachedFeed(_feed(1, 2, 3)))
+        hub._on_feed_changed(url)
+        await channel._task
+
+        frame = q1.get_nowait()
+        assert frame is q2.get_nowait()
+        assert b'"summary":"3"' in frame
+        assert b'"summary":"2"' not in frame
+    assert hub.stats() == {"channels": 0, "subscribers": 0}
+    assert await poller.tracked() == []
+
+
+@pytest.mark.asyncio
+async def test_channels_are_keyed_by_filter_rules(monkeypatch):
+    from nitter_timeline.services.filters import FilterRules
+
+    url = "https://nitter.net/live/rss"
+    monkeypatch.setitem(fetcher._validators, url, fetcher.CachedFeed(_feed(1)))
+    monkeypatch.setattr(settings, "default_feeds", [])
+    monkeypatch.setattr(poller, "_sources", [])
+    hub = LiveHub()
+    muted = FilterRules.from_params(keywords=["3"])
+
+    async with (
+        hub.subscribe([url]) as (plain, q1),
+        hub.subscribe([url], muted) as (filtered, q2),
+        hub.subscribe([url], FilterRules.from_params(keywords=["3 "])) as (same, _q3),
+    ):
+        assert filtered is not plain
+        assert same is filtered
+        assert hub.stats() == {"channels": 2, "subscribers": 3}
+        monkeypatch.setitem(fetcher._validators, url, fetcher.CachedFeed(_feed(1, 3)))
+        hub._on_feed_changed(url)
+        await plain._task
+        await filtered._task
+
+        assert b'"summary":"3"' in q1.get_nowait()
+        assert q2.empty()
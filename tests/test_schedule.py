@@ -0,0 +1,42 @@
+import time
+from email.utils import formatdate
+
+from nitter_timeline.services.schedule import RefreshScheduler
+
+
+def _feed(gap_seconds, count=10):
+    now = time.time()
+    return {
+        "entries": [
+            {"published": formatdate(now - gap_seconds * n, usegmt=True)}
+            for n in range(count)
+        ]
+    }
+
+
+def test_busy_feeds_refresh_sooner_than_quiet_ones():
+    sched = RefreshScheduler(min_interval=30, max_interval=3600, jitter=0.1)
+
+    busy = sched.observe("busy", changed=True, parsed=_feed(120))
+    quiet = sched.observe("quiet", changed=True, parsed=_feed(86400))
+    assert 30 <= busy < 120
+    assert quiet == 3600
+
+    # A feed that keeps answering 304 backs off, but stays within bounds.
+    intervals = [sched.observe("busy", changed=False) for _ in range(10)]
+    assert intervals[-1] > busy
+    assert all(30 <= i <= 3600 for i in intervals)
+
+    stats = sched.snapshot()["busy"]
+    assert (stats["checks"], stats["changes"]) == (11, 1)
+    assert sched.seconds_until_due(["busy", "quiet"]) > 0
+
+
+def test_failed_checks_back_off_exponentially():
+    sched = RefreshScheduler(min_interval=30, max_interval=600, jitter=0.0)
+    delays = [sched.fail("down") for _ in range(6)]
+    assert delays == [30, 60, 120, 240, 480, 600]
+    assert sched.seconds_until_due(["down"]) > 500
+    # A successful check resets the back-off.
+    sched.observe("down", changed=True)
+    assert sched.snapshot()["down"]["failures"] == 0
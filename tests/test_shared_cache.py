@@ -0,0 +1,30 @@
+import time
+
+from nitter_timeline.services.shared_cache import SharedEntry, SQLiteSharedCache
+
+
+def test_lease_is_exclusive_across_workers(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    a, b = SQLiteSharedCache(path), SQLiteSharedCache(path)
+
+    assert a.acquire("u", "worker-a", ttl=30)
+    assert not b.acquire("u", "worker-b", ttl=30)
+    a.release("u", "worker-a")
+    assert b.acquire("u", "worker-b", ttl=-1)  # already expired
+    assert a.acquire("u", "worker-a", ttl=30)  # takes over the stale lease
+    a.close()
+    b.close()
+
+
+def test_entries_are_visible_to_other_workers(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    a, b = SQLiteSharedCache(path), SQLiteSharedCache(path)
+    a.put("u", SharedEntry("v1", time.time(), '"e1"', None, b"<rss/>"))
+
+    assert b.peek("u").body is None
+    entry = b.get("u")
+    assert (entry.version, entry.etag, entry.body) == ("v1", '"e1"', b"<rss/>")
+    b.touch("u", entry.fetched_at + 5, interval=120.0)
+    assert (a.peek("u").fetched_at, a.peek("u").interval) == (entry.fetched_at + 5, 120.0)
+    a.close()
+    b.close()
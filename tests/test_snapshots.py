@@ -0,0 +1,72 @@
+import weakref
+
+import feedparser
+from cachetools import LRUCache
+
+from nitter_timeline.services import aggregator
+from nitter_timeline.services.aggregator import parse_items
+from nitter_timeline.services.snapshots import CachedFeed, SnapshotCache, compact_feed
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>t</title>
+<item><title>hi</title><dc:creator>@a</dc:creator>
+<link>https://nitter.net/a/status/42#m</link>
+<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>
+<description><![CDATA[<p>hello</p>]]></description></item>
+</channel></rss>"""
+
+
+def test_compact_feed_keeps_what_the_timeline_uses():
+    parsed = feedparser.parse(RSS)
+    snapshot = compact_feed(parsed)
+    [entry] = snapshot["entries"]
+    assert "summary_detail" not in entry and "title_detail" not in entry
+    assert entry["published_parsed"][:3] == (2024, 1, 1)
+
+    [full], [compact] = parse_items(parsed), parse_items(snapshot)
+    assert (compact.id, compact.author, compact.content_html, compact.published) == (
+        full.id, full.author, full.content_html, full.published
+    )
+
+
+def _entry(n, size=2000):
+    return CachedFeed(compact_feed({"entries": [{"summary": "x" * size}]}), version=f"v{n}")
+
+
+def test_cache_is_bounded_by_bytes_and_counts_evictions():
+    cache = SnapshotCache(max_bytes=10_000)
+    for n in range(10):
+        cache[f"u{n}"] = _entry(n)
+    stats = cache.stats()
+    assert stats.bytes <= 10_000
+    assert stats.evictions == 10 - stats.entries > 0
+    assert cache.get("u0") is None and cache.get("u9") is not None
+    assert (cache.stats().hits, cache.stats().misses) == (1, 1)
+
+
+def test_compressed_cache_shares_decoded_snapshots():
+    cache = SnapshotCache(max_bytes=10_000, compress=True)
+    entry = _entry(1, size=50_000)
+    cache["u"] = entry
+    assert cache.stats().bytes < 5_000
+    assert cache.get("u").parsed is entry.parsed
+    held = cache.get("u").parsed
+    del entry
+    assert cache.get("u").parsed is held
+
+
+def test_normalized_items_do_not_pin_snapshots_beyond_the_budget(monkeypatch):
+    monkeypatch.setattr(
+        aggregator, "_feed_items", LRUCache(maxsize=20_000, getsizeof=lambda v: v[2])
+    )
+    monkeypatch.setattr(aggregator, "_item_cache", {})
+    snapshots = [
+        compact_feed({"entries": [{"id": f"b{n}", "summary": str(n) * 4000}]})
+        for n in range(10)
+    ]
+    refs = [weakref.ref(s) for s in snapshots]
+    for n, snapshot in enumerate(snapshots):
+        aggregator.feed_items(f"u{n}", snapshot)
+    del snapshot, snapshots
+    assert aggregator._feed_items.currsize <= 20_000
+    assert refs[0]() is None and refs[-1]() is not None
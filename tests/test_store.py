@@ -0,0 +1,51 @@
+from datetime import UTC, datetime
+
+from nitter_timeline.models.feed import FeedRecord
+from nitter_timeline.services.store import ItemStore
+
+
+def test_store_round_trips_feeds_and_items(tmp_path):
+    path = str(tmp_path / "nt.sqlite3")
+    store = ItemStore(path, batch_size=100)
+    store.save_feed("u", '"e1"', None, b"<rss/>")
+    store.add_items(
+        "u",
+        [
+            FeedRecord(id=f"i{n}", author="a", content_html="x",
+                     published=datetime(2024, 1, n, tzinfo=UTC),
+                     raw={"big": "entry"})
+            for n in (1, 2, 3)
+        ],
+    )
+    store.close()
+
+    reopened = ItemStore(path)
+    [feed] = reopened.load_feeds()
+    assert (feed.url, feed.etag, feed.body) == ("u", '"e1"', b"<rss/>")
+    history = reopened.history("u", limit=2)
+    assert [i.id for i in history] == ["i3", "i2"]
+    assert history[0].raw is None
+    reopened.close()
+
+
+def test_flush_prunes_items_beyond_the_per_feed_limit(tmp_path):
+    store = ItemStore(str(tmp_path / "nt.sqlite3"), keep_per_feed=2)
+    for url in ("u", "v"):
+        store.add_items(
+            url,
+            [
+                FeedRecord(id=f"{url}{n}", author="a", content_html="x",
+                           published=datetime(2024, 1, n, tzinfo=UTC))
+                for n in (1, 2, 3)
+            ],
+        )
+    store.flush()
+    store.add_items(
+        "u", [FeedRecord(id="u4", author="a", content_html="x",
+                         published=datetime(2024, 1, 4, tzinfo=UTC))]
+    )
+    store.flush()
+
+    assert [i.id for i in store.history("u", limit=10)] == ["u4", "u3"]
+    assert [i.id for i in store.history("v", limit=10)] == ["v3", "v2"]
+    store.close()
@@ -0,0 +1,53 @@
+import socket
+
+from nitter_timeline.services import validation
+
+
+async def test_host_verdicts_are_cached(monkeypatch):
+    calls = []
+
+    async def fake_getaddrinfo(host, port):
+        calls.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.216.34", 0))]
+
+    validation._host_verdicts.clear()
+    monkeypatch.setattr(
+        validation.asyncio.get_running_loop(), "getaddrinfo", fake_getaddrinfo
+    )
+    urls = ["https://nitter.net/a/rss", "https://nitter.net/b/rss"]
+    assert await validation.filter_feed_urls(urls) == urls
+    assert await validation.is_allowed_feed_url(urls[0])
+    assert calls == ["nitter.net"]
+    validation._host_verdicts.clear()
+
+
+async def test_private_and_malformed_hosts_are_rejected(monkeypatch):
+    async def fake_getaddrinfo(host, port):
+        if host == "local.nitter.net":
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 0))]
+        return await real_getaddrinfo(host, port)
+
+    loop = validation.asyncio.get_running_loop()
+    real_getaddrinfo = loop.getaddrinfo
+    validation._host_verdicts.clear()
+    monkeypatch.setattr(loop, "getaddrinfo", fake_getaddrinfo)
+    urls = ["https://local.nitter.net/a/rss", "https://a..nitter.net/x/rss"]
+    assert await validation.filter_feed_urls(urls) == []
+    # Resolver failures are not cached; the private verdict is.
+    assert dict(validation._host_verdicts) == {"local.nitter.net": False}
+    validation._host_verdicts.clear()
+
+
+async def test_mirrors_follow_the_feed_url_rules(monkeypatch):
+    from nitter_timeline.services.mirrors import MirrorPool
+
+    validation._host_verdicts.clear()
+    monkeypatch.setitem(validation._host_verdicts, "nitter.net", True)
+    monkeypatch.setitem(validation._host_verdicts, "lan.nitter.net", False)
+    pool = MirrorPool(
+        ["https://nitter.net", "https://nitter.poast.org", "https://lan.nitter.net"]
+    )
+    assert pool.origins == ["https://nitter.net", "https://lan.nitter.net"]
+    await pool.validate()
+    assert pool.candidates("https://nitter.net/a/rss") == ["https://nitter.net/a/rss"]
+    assert "https://lan.nitter.net" not in pool.snapshot()